@@ -3,7 +3,8 @@
 
 This module serves as a single import interface for all utility functions
 and classes used in the Mac setup scripts. It provides a clean API by
-re-exporting functions from specialized utility modules.
+re-exporting functions from specialized utility modules, which are imported
+lazily on first use.
 
 The utilities are organized into the following categories:
 - Core: Basic functionality like command execution, printing, and state management
@@ -19,88 +20,177 @@ Example:
     >>> setup_oh_my_zsh()
 """
 
-from typing import List
+import importlib
+from typing import Any, Dict, List
 
-from .utils_app import (
-    setup_git_config,
-    setup_h_cli,
-    setup_korean_english_key_remapping,
-)
-from .utils_core import Colors  # Terminal color constants for formatted output
-from .utils_core import (  # Output formatting functions; Command execution; State management; File manipulation; System configuration
-    append_shell_section,
-    cleanup_auto_generated_blocks,
-    clear_crontab,
-    command_exists,
-    create_launch_agent,
-    get_completion_flag_path,
-    is_step_completed,
-    mark_step_completed,
-    print_error,
-    print_info,
-    print_success,
-    print_warning,
-    prompt_for_user_input,
-    run_command,
-    setup_cron_job,
-)
-from .utils_install import (  # Package managers; Development environments
-    install_brew_package,
-    install_homebrew,
-    install_mas_app,
-    setup_docker_cli_colima,
-    setup_nvm_and_node_lts,
-    setup_pipx,
-    setup_pnpm,
-    setup_pyenv,
-    setup_uv,
-)
-from .utils_ssh import (
-    setup_ssh_backup_cron,
-    setup_ssh_key,
-)
-from .utils_zsh import setup_atuin  # Shell history database
-from .utils_zsh import setup_autojump  # Directory jumping
-from .utils_zsh import setup_fzf  # Fuzzy finder
-from .utils_zsh import (  # Core shell setup; Shell plugins and enhancements
-    align_zsh_plugins,
-    setup_custom_aliases,
-    setup_fast_syntax_highlighting,
-    setup_iterm2_natural_text_editing,
-    setup_mitm_chrome,
-    setup_oh_my_zsh,
-    setup_zsh_autosuggestions,
-)
+# Submodules are imported on first attribute access (PEP 562), so a script that
+# only needs the core helpers never loads the installer, SSH, or ZSH modules.
+# Maps each exported name to the submodule that defines it.
+_LAZY: Dict[str, str] = {}
 
 # ============================================================================
 # APPLICATION UTILITIES
 # ============================================================================
 # Functions for configuring specific applications and tools
 
+_LAZY.update(
+    dict.fromkeys(
+        [
+            "setup_git_config",
+            "setup_h_cli",
+            "setup_korean_english_key_remapping",
+        ],
+        ".utils_app",
+    )
+)
+
 
 # ============================================================================
 # CORE UTILITIES
 # ============================================================================
 # Essential functions for command execution, output formatting, and state management
 
+_LAZY.update(
+    dict.fromkeys(
+        [
+            "Colors",  # Terminal color constants for formatted output
+            # Output formatting functions
+            "print_error",
+            "print_info",
+            "print_success",
+            "print_warning",
+            # Command execution
+            "command_exists",
+            "run_command",
+            "start_sudo_keepalive",
+            # Parallel execution
+            "run_parallel",
+            "run_step_graph",
+            # Installer scripts
+            "fetch_all",
+            "prefetch_installer_scripts",
+            "run_installer_script",
+            # State management
+            "is_step_completed",
+            "mark_step_completed",
+            # File manipulation
+            "append_shell_section",
+            "append_shell_sections",
+            "cleanup_auto_generated_blocks",
+            "commit_shell_sections",
+            "write_text_atomic",
+            # System configuration
+            "clear_crontab",
+            "create_launch_agent",
+            "prompt_for_user_input",
+            "setup_cron_job",
+            "setup_cron_jobs",
+        ],
+        ".utils_core",
+    )
+)
+
 
 # ============================================================================
 # INSTALLATION UTILITIES
 # ============================================================================
 # Package managers and software installation functions
 
+_LAZY.update(
+    dict.fromkeys(
+        [
+            # Package managers
+            "install_brew_package",
+            "install_brew_packages",
+            "install_default_bundle",
+            "install_homebrew",
+            "install_mas_app",
+            "install_mas_apps",
+            "prefetch_brew_packages",
+            "prescan_installed_packages",
+            "start_brew_update",
+            # Development environments
+            "setup_docker_cli_colima",
+            "setup_docker_compose_plugin",
+            "setup_nvm_and_node_lts",
+            "setup_pipx",
+            "setup_pnpm",
+            "setup_pyenv",
+            "setup_uv",
+        ],
+        ".utils_install",
+    )
+)
+
 
 # ============================================================================
 # SSH UTILITIES
 # ============================================================================
 # SSH key management and backup configuration
 
+_LAZY.update(
+    dict.fromkeys(
+        [
+            "setup_ssh_backup_cron",
+            "setup_ssh_key",
+        ],
+        ".utils_ssh",
+    )
+)
+
 
 # ============================================================================
 # ZSH SHELL UTILITIES
 # ============================================================================
 # Shell configuration, plugins, and enhancements
 
+_LAZY.update(
+    dict.fromkeys(
+        [
+            # Core shell setup
+            "align_zsh_plugins",
+            "setup_oh_my_zsh",
+            # Shell plugins and enhancements
+            "setup_atuin",  # Shell history database
+            "setup_autojump",  # Directory jumping
+            "setup_custom_aliases",
+            "setup_fast_syntax_highlighting",
+            "setup_fzf",  # Fuzzy finder
+            "setup_iterm2_natural_text_editing",
+            "setup_mitm_chrome",
+            "setup_zsh_autosuggestions",
+        ],
+        ".utils_zsh",
+    )
+)
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodule defining ``name`` on first access.
+
+    Args:
+        name: The attribute being looked up on the package
+
+    Returns:
+        Any: The exported function or class
+
+    Raises:
+        AttributeError: If ``name`` is not part of the public API
+    """
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups bypass __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the public API alongside the already-loaded module globals."""
+    return sorted(set(globals()) | set(__all__))
+
 
 # ============================================================================
 # PUBLIC API
@@ -115,26 +205,42 @@ __all__: List[str] = [
     "print_info",
     "print_warning",
     "run_command",
+    "start_sudo_keepalive",
+    "run_parallel",
+    "run_step_graph",
+    "fetch_all",
+    "prefetch_installer_scripts",
+    "run_installer_script",
     "command_exists",
-    "get_completion_flag_path",
     "is_step_completed",
     "mark_step_completed",
     "cleanup_auto_generated_blocks",
     "append_shell_section",
+    "append_shell_sections",
+    "commit_shell_sections",
+    "write_text_atomic",
     "clear_crontab",
     "setup_cron_job",
+    "setup_cron_jobs",
     "create_launch_agent",
     "prompt_for_user_input",
     # --- Installation Utilities ---
     "install_homebrew",
     "install_brew_package",
+    "install_brew_packages",
+    "install_default_bundle",
     "install_mas_app",
+    "install_mas_apps",
+    "prefetch_brew_packages",
+    "prescan_installed_packages",
+    "start_brew_update",
     "setup_nvm_and_node_lts",
     "setup_pnpm",
     "setup_pyenv",
     "setup_uv",
     "setup_pipx",
     "setup_docker_cli_colima",
+    "setup_docker_compose_plugin",
     # --- ZSH Shell Utilities ---
     "setup_oh_my_zsh",
     "setup_zsh_autosuggestions",
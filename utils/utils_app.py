@@ -6,12 +6,14 @@ on macOS, including Git configuration, h-cli installation, and keyboard
 remapping utilities.
 """
 
+import configparser
 import os
 import shutil
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from .utils_core import (
+    HOME,
     Colors,
     create_launch_agent,
     is_step_completed,
@@ -28,6 +30,22 @@ H_CLI_REPO_URL = "https://github.com/turtiesio/h-cli.git"
 H_CLI_DIR_NAME = ".h-cli"
 H_CLI_CONFIG_DIR_NAME = ".config/h-cli"
 H_CLI_CONFIG_FILE_NAME = "config.yaml"
+H_CLI_DIR = HOME / H_CLI_DIR_NAME
+
+# Files read by 'git config --global', in increasing order of precedence
+GIT_GLOBAL_CONFIG_PATHS = [
+    Path(os.environ.get("XDG_CONFIG_HOME") or HOME / ".config") / "git" / "config",
+    HOME / ".gitconfig",
+]
+
+# Defaults applied alongside the user name and email
+GIT_DEFAULT_CONFIG = {
+    "init": {"defaultBranch": "main"},
+    "pull": {"rebase": "false"},
+}
+
+# Backslash escapes git accepts in config values, mapped to what they stand for
+_GIT_CONFIG_ESCAPES = {'"': '"', "\\": "\\", "n": "\n", "t": "\t", "b": "\b"}
 
 # Korean-English key remapping constants
 KEY_REMAPPING_LABEL = "com.example.KeyRemapping"
@@ -52,7 +70,7 @@ def setup_korean_english_key_remapping() -> None:
     )
 
     # Apply the key remapping immediately
-    run_command(f"hidutil property --set '{key_mapping_json}'")
+    run_command(["hidutil", "property", "--set", key_mapping_json])
 
     # Create launch agent XML with proper formatting
     launch_agent_xml = _create_key_remapping_plist(key_mapping_json)
@@ -100,18 +118,14 @@ def setup_h_cli() -> None:
     """
     print_info("Setting up h-cli...")
 
-    # Define paths
-    home_dir = Path(os.environ["HOME"])
-    h_cli_dir = home_dir / H_CLI_DIR_NAME
-
     # Install or update h-cli
-    if h_cli_dir.exists():
-        _update_h_cli_if_needed(h_cli_dir)
+    if H_CLI_DIR.exists():
+        _update_h_cli_if_needed(H_CLI_DIR)
     else:
-        _install_h_cli(h_cli_dir)
+        _install_h_cli(H_CLI_DIR)
 
     # Set up configuration
-    _setup_h_cli_config(home_dir, h_cli_dir)
+    _setup_h_cli_config(HOME, H_CLI_DIR)
 
     print_info("You can now use 'h' command. Try 'h --help' to see available commands.")
 
@@ -122,68 +136,72 @@ def _update_h_cli_if_needed(h_cli_dir: Path) -> None:
     Args:
         h_cli_dir: Path to the h-cli directory
     """
-    # Fetch latest changes
-    run_command(f"cd {h_cli_dir} && git fetch", check=False)
-
-    # Determine default branch
-    default_branch = _get_default_branch(h_cli_dir)
-
-    # Compare local and remote commits
-    local_hash, remote_hash = _get_git_hashes(h_cli_dir, default_branch)
+    # Compare the local commit with the remote default branch
+    local_hash = _get_local_head_hash(h_cli_dir)
+    remote_hash = _get_remote_head_hash(h_cli_dir)
 
     if local_hash and remote_hash and local_hash != remote_hash:
         print_info("Updates available for h-cli...")
-        run_command(f"cd {h_cli_dir} && git pull")
+        run_command(["git", "pull"], cwd=h_cli_dir)
         _install_h_cli_globally(h_cli_dir)
     else:
         print_success("h-cli is already up to date")
 
 
-def _get_default_branch(h_cli_dir: Path) -> str:
-    """Determine the default branch name for the Git repository.
+def _get_local_head_hash(h_cli_dir: Path) -> Optional[str]:
+    """Get the commit hash of the local HEAD by reading the .git directory.
+
+    Falls back to 'git rev-parse HEAD' for layouts it doesn't handle, such as
+    a .git file pointing elsewhere.
 
     Args:
         h_cli_dir: Path to the Git repository
 
     Returns:
-        str: The default branch name ('main' or 'master')
+        The local HEAD commit hash, or None if it can't be determined
     """
-    # Try to get default branch from symbolic ref
-    default_branch = run_command(
-        f"cd {h_cli_dir} && git symbolic-ref refs/remotes/origin/HEAD | "
-        f"sed 's@^refs/remotes/origin/@@'",
-        check=False,
-    )
+    git_dir = h_cli_dir / ".git"
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return head  # Detached HEAD holds the hash itself
 
-    if default_branch:
-        return default_branch
+        ref = head[len("ref: ") :]
+        ref_file = git_dir / ref
+        if ref_file.exists():
+            return ref_file.read_text().strip()
 
-    # Fallback: check if master branch exists
-    has_master = run_command(
-        f"cd {h_cli_dir} && git branch -r | grep -q origin/master", check=False
-    )
+        # Refs packed by 'git gc' look like "<sha> refs/heads/main"
+        for line in (git_dir / "packed-refs").read_text().splitlines():
+            if line.endswith(f" {ref}"):
+                return line.split()[0]
+    except OSError:
+        pass
 
-    return "master" if has_master is not None else "main"
+    return run_command(["git", "rev-parse", "HEAD"], check=False, cwd=h_cli_dir)
 
 
-def _get_git_hashes(
-    h_cli_dir: Path, branch: str
-) -> Tuple[Optional[str], Optional[str]]:
-    """Get local and remote Git commit hashes.
+def _get_remote_head_hash(h_cli_dir: Path) -> Optional[str]:
+    """Get the commit hash of the remote's default branch.
+
+    A single 'git ls-remote' asks the remote directly, so no fetch or branch
+    lookup is needed just to check for updates.
 
     Args:
         h_cli_dir: Path to the Git repository
-        branch: Name of the branch to check
 
     Returns:
-        Tuple of (local_hash, remote_hash)
+        The remote HEAD commit hash, or None if the remote is unreachable
     """
-    local_hash = run_command(f"cd {h_cli_dir} && git rev-parse HEAD", check=False)
-    remote_hash = run_command(
-        f"cd {h_cli_dir} && git rev-parse origin/{branch}", check=False
+    # Output looks like "<sha>\tHEAD"
+    remote_head = run_command(
+        ["git", "ls-remote", "origin", "HEAD"], check=False, cwd=h_cli_dir
     )
 
-    return local_hash, remote_hash
+    if not remote_head:
+        return None
+
+    return remote_head.split()[0]
 
 
 def _install_h_cli(h_cli_dir: Path) -> None:
@@ -193,7 +211,7 @@ def _install_h_cli(h_cli_dir: Path) -> None:
         h_cli_dir: Path where h-cli should be installed
     """
     print_info("Cloning h-cli repository...")
-    run_command(f"git clone {H_CLI_REPO_URL} {h_cli_dir}")
+    run_command(["git", "clone", H_CLI_REPO_URL, str(h_cli_dir)])
     _install_h_cli_globally(h_cli_dir)
 
 
@@ -204,7 +222,7 @@ def _install_h_cli_globally(h_cli_dir: Path) -> None:
         h_cli_dir: Path to the h-cli directory
     """
     print_info("Installing h-cli globally...")
-    run_command(f"cd {h_cli_dir} && make install-global")
+    run_command(["make", "install-global"], cwd=h_cli_dir)
     print_success("h-cli installed successfully")
 
 
@@ -242,7 +260,7 @@ def _copy_default_config(h_cli_dir: Path, config_dir: Path, config_file: Path) -
     default_config = h_cli_dir / "config" / "default.yaml"
 
     if default_config.exists():
-        shutil.copy2(default_config, config_file)
+        shutil.copyfile(default_config, config_file)
         print_success("Copied default h-cli config")
     else:
         print_warning("Could not find default config in h-cli repository")
@@ -266,6 +284,7 @@ def _prompt_for_api_keys(config_file: Path) -> None:
     response = prompt_for_user_input(
         "Type 'done' when you have added your API keys (or 'skip' to configure later)",
         valid_responses=["done", "skip"],
+        default="skip",
     )
 
     # Handle response
@@ -304,8 +323,7 @@ def setup_git_config() -> None:
     print_info("Setting up Git configuration...")
 
     # Check existing configuration
-    existing_name = run_command("git config --global user.name", check=False)
-    existing_email = run_command("git config --global user.email", check=False)
+    existing_name, existing_email = _read_git_user_config()
 
     if existing_name and existing_email:
         _display_existing_git_config(existing_name, existing_email)
@@ -318,6 +336,119 @@ def setup_git_config() -> None:
     _apply_git_config(name, email)
 
 
+def _read_git_user_config() -> Tuple[Optional[str], Optional[str]]:
+    """Read the global Git user name and email, running git only if needed.
+
+    configparser doesn't follow [include]/[includeIf] or match subsections the
+    way git does, so any value the config files don't give directly is read
+    with 'git config --global --get' instead.
+
+    Returns:
+        Tuple of (name, email), each None if not configured
+    """
+    name = email = None
+
+    parser = _load_git_global_config()
+    if parser is not None:
+        name = _get_git_config_value(parser, "user", "name") or None
+        email = _get_git_config_value(parser, "user", "email") or None
+
+    if name is None:
+        name = _read_git_global_value("user.name")
+    if email is None:
+        email = _read_git_global_value("user.email")
+    return name, email
+
+
+def _read_git_global_value(key: str) -> Optional[str]:
+    """Read one value from the global Git config with git itself.
+
+    Args:
+        key: The config key, e.g. 'user.name'
+
+    Returns:
+        The configured value, or None if it isn't set
+    """
+    value = run_command(["git", "config", "--global", "--get", key], check=False)
+    return value or None
+
+
+def _load_git_global_config() -> Optional[configparser.ConfigParser]:
+    """Parse the global Git config files.
+
+    Returns:
+        The parsed config, or None if a file isn't valid INI syntax
+    """
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    try:
+        parser.read(GIT_GLOBAL_CONFIG_PATHS)
+    except configparser.Error:
+        return None
+    return parser
+
+
+def _get_git_config_value(
+    parser: configparser.ConfigParser, section: str, key: str
+) -> Optional[str]:
+    """Get a value from a parsed Git config the way git itself reads it.
+
+    Args:
+        parser: The parsed Git config
+        section: The section name, e.g. 'user'
+        key: The key within the section, e.g. 'name'
+
+    Returns:
+        The unquoted value, or None if it isn't set or git would reject it
+    """
+    raw_value = parser.get(section, key, fallback=None)
+    if raw_value is None:
+        return None
+    return _unquote_git_config_value(raw_value)
+
+
+def _unquote_git_config_value(raw_value: str) -> Optional[str]:
+    """Undo git config quoting, escapes and inline comments in a raw value.
+
+    Double quotes are removed and keep '#', ';' and whitespace inside them
+    verbatim; outside quotes, '#' or ';' starts a comment and trailing
+    whitespace is dropped. Backslash escapes are resolved as git does.
+
+    Args:
+        raw_value: The value text after '=', as read by configparser
+
+    Returns:
+        The value git would see, or None for an invalid escape or quote
+    """
+    value = []
+    pending_spaces = ""
+    in_quotes = False
+    chars = iter(raw_value.strip())
+
+    for char in chars:
+        if not in_quotes and char in "#;":
+            break
+        if not in_quotes and char.isspace():
+            pending_spaces += " "
+            continue
+
+        value.append(pending_spaces)
+        pending_spaces = ""
+
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == "\\":
+            escaped = _GIT_CONFIG_ESCAPES.get(next(chars, ""))
+            if escaped is None:
+                return None
+            value.append(escaped)
+        else:
+            value.append(char)
+
+    if in_quotes:
+        return None
+    return "".join(value)
+
+
 def _display_existing_git_config(name: str, email: str) -> None:
     """Display existing Git configuration.
 
@@ -390,13 +521,20 @@ def _apply_git_config(name: str, email: str) -> None:
         name: User's full name
         email: User's email address
     """
-    # Set user information
-    run_command(f'git config --global user.name "{name}"')
-    run_command(f'git config --global user.email "{email}"')
-
-    # Set sensible defaults
-    run_command("git config --global init.defaultBranch main")
-    run_command("git config --global pull.rebase false")
+    config = {"user": {"name": name, "email": email}, **GIT_DEFAULT_CONFIG}
+
+    if any(path.exists() for path in GIT_GLOBAL_CONFIG_PATHS):
+        # Let git merge the settings that differ into the existing file
+        current = _load_git_global_config()
+        for section, values in config.items():
+            for key, value in values.items():
+                if current is not None:
+                    if _get_git_config_value(current, section, key) == value:
+                        continue
+                run_command(["git", "config", "--global", f"{section}.{key}", value])
+    else:
+        # No global config yet, so write the whole file at once
+        _write_git_config_file(HOME / ".gitconfig", config)
 
     # Display confirmation
     print_success("Git configuration updated:")
@@ -404,3 +542,23 @@ def _apply_git_config(name: str, email: str) -> None:
     print_success(f"  Email: {email}")
     print_info("  Default branch: main")
     print_info("  Pull strategy: merge (not rebase)")
+
+
+def _write_git_config_file(
+    config_path: Path, config: Dict[str, Dict[str, str]]
+) -> None:
+    """Write a new Git config file in git's own format.
+
+    Args:
+        config_path: Path of the config file to create
+        config: Mapping of section name to its key/value pairs
+    """
+    lines = []
+    for section, values in config.items():
+        lines.append(f"[{section}]")
+        for key, value in values.items():
+            # Quote values so '#', ';' and spaces are kept verbatim
+            escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'\t{key} = "{escaped}"')
+
+    config_path.write_text("\n".join(lines) + "\n")
@@ -7,13 +7,80 @@ This module provides essential utilities for system configuration, including:
 - Configuration file management
 - Cron job and LaunchAgent setup
 - Progress tracking for multi-step processes
+- Parallel execution of independent setup steps
 """
 
+import atexit
+import functools
+import hashlib
+import json
 import os
+import shutil
 import subprocess
+import sys
 import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
+from importlib import resources
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Maximum number of setup steps run at the same time by run_parallel
+PARALLEL_MAX_WORKERS = 8
+
+# Serializes shell config file edits made from parallel setup steps
+shell_config_lock = threading.Lock()
+
+# Shell config sections queued by append_shell_section, keyed by config file
+_pending_shell_sections: Dict[Path, List[str]] = {}
+
+# Common paths, resolved once at import
+HOME = Path(os.environ.get("HOME") or os.path.expanduser("~"))
+ZSHRC = HOME / ".zshrc"
+ZPROFILE = HOME / ".zprofile"
+SSH_DIR = HOME / ".ssh"
+LAUNCH_AGENTS_DIR = HOME / "Library" / "LaunchAgents"
+
+# Official install scripts for tools that are not installed with Homebrew
+INSTALLER_SCRIPT_URLS = {
+    "homebrew": "https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh",
+    "oh-my-zsh": "https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh",
+    "uv": "https://astral.sh/uv/install.sh",
+    "atuin": "https://setup.atuin.sh",
+}
+
+# Optional sha256 digests to pin installer scripts to, keyed by name. Scripts
+# that don't match their pinned digest are refused instead of run.
+INSTALLER_SCRIPT_SHA256: Dict[str, str] = {}
+
+# Paths that show an installer's tool is already there. Installers not listed
+# here are checked with command_exists on their name.
+INSTALLER_TOOL_PATHS = {
+    "homebrew": [Path("/opt/homebrew/bin/brew"), Path("/usr/local/bin/brew")],
+    "oh-my-zsh": [HOME / ".oh-my-zsh"],
+}
+
+# Installer scripts loaded by prefetch_installer_scripts, keyed by name
+_installer_scripts: Dict[str, str] = {}
+_installer_scripts_lock = threading.Lock()
+
+# Marker lines fencing the sections written by append_shell_section. Lines
+# without the hint can't be markers, which skips both searches for most lines.
+_START_MARK = "###### START(AUTO-GENERATED DO NOT EDIT) ######"
+_END_MARK = "###### END(AUTO-GENERATED DO NOT EDIT) ######"
+_MARK_HINT = "######"
+
+# Manifest of completed setup steps, shared by all runs of the setup scripts
+STATE_FILE_PATH = HOME / ".mac-setup-state.json"
+
+# Set to answer prompts with their default instead of waiting for input
+NONINTERACTIVE_ENV = "MAC_SETUP_NONINTERACTIVE"
+
+# Seconds between sudo timestamp refreshes, well under sudo's 5 minute default
+SUDO_KEEPALIVE_INTERVAL = 60
 
 # ===== ANSI Color Codes =====
 
@@ -32,8 +99,33 @@ class Colors:
     RESET = "\033[0m"
 
 
+# Drop the escape codes when output isn't a terminal, e.g. piped to a log
+if not sys.stdout.isatty() or os.environ.get("NO_COLOR"):
+    for _color_name in ("GREEN", "BLUE", "YELLOW", "RED", "RESET"):
+        setattr(Colors, _color_name, "")
+
+
 # ===== Console Output Functions =====
 
+# Message prefixes, built once instead of on every call
+_SUCCESS_PREFIX = f"{Colors.GREEN}✓{Colors.RESET} "
+_ERROR_PREFIX = f"{Colors.RED}✗{Colors.RESET} "
+_INFO_PREFIX = f"{Colors.BLUE}→{Colors.RESET} "
+_WARNING_PREFIX = f"{Colors.YELLOW}!{Colors.RESET} "
+
+
+def _write_line(prefix: str, message: str) -> None:
+    """Write a prefixed message line to stdout.
+
+    The line is written with a single call, so messages from parallel steps
+    don't interleave mid-line the way print()'s separate newline write can.
+
+    Args:
+        prefix: The colored marker to put in front of the message
+        message: The message to display
+    """
+    sys.stdout.write(prefix + message + "\n")
+
 
 def print_success(message: str) -> None:
     """Print a success message with a green checkmark.
@@ -41,7 +133,7 @@ def print_success(message: str) -> None:
     Args:
         message: The success message to display
     """
-    print(f"{Colors.GREEN}✓{Colors.RESET} {message}")
+    _write_line(_SUCCESS_PREFIX, message)
 
 
 def print_error(message: str) -> None:
@@ -50,7 +142,7 @@ def print_error(message: str) -> None:
     Args:
         message: The error message to display
     """
-    print(f"{Colors.RED}✗{Colors.RESET} {message}")
+    _write_line(_ERROR_PREFIX, message)
 
 
 def print_info(message: str) -> None:
@@ -59,7 +151,7 @@ def print_info(message: str) -> None:
     Args:
         message: The info message to display
     """
-    print(f"{Colors.BLUE}→{Colors.RESET} {message}")
+    _write_line(_INFO_PREFIX, message)
 
 
 def print_warning(message: str) -> None:
@@ -68,103 +160,413 @@ def print_warning(message: str) -> None:
     Args:
         message: The warning message to display
     """
-    print(f"{Colors.YELLOW}!{Colors.RESET} {message}")
+    _write_line(_WARNING_PREFIX, message)
 
 
 # ===== Command Execution =====
 
 
 def run_command(
-    command: str, check: bool = True, shell: str = "/bin/zsh"
+    command: Union[str, List[str]],
+    check: bool = True,
+    shell: str = "/bin/sh",
+    env: Optional[Dict[str, str]] = None,
+    input: Optional[str] = None,
+    cwd: Optional[Union[str, Path]] = None,
 ) -> Optional[str]:
-    """Execute a shell command and return its output.
+    """Execute a command and return its output.
+
+    A string is run through the shell, which is only needed for shell
+    features such as pipes, redirection, or eval. An argument list is
+    executed directly, saving the extra shell process per call.
+
+    Output is read as bytes and only stdout is decoded. Stderr is discarded
+    unless check=True, where it is kept for the raised CalledProcessError.
 
     Args:
-        command: The shell command to execute
+        command: Shell command string, or argument list to run without a shell
         check: If True, raise CalledProcessError on non-zero exit
-        shell: Path to the shell executable (defaults to zsh)
+        shell: Path to the shell executable for string commands (defaults to sh)
+        env: Optional extra environment variables for the command
+        input: Optional text to send to the command's stdin
+        cwd: Optional working directory, instead of a 'cd dir &&' prefix
 
     Returns:
         The command's stdout as a string if successful, None if failed
 
     Raises:
         subprocess.CalledProcessError: If check=True and command fails
+        FileNotFoundError: If check=True and an argument list's program is missing
     """
+    use_shell = isinstance(command, str)
+
     try:
         result = subprocess.run(
             command,
-            shell=True,
+            shell=use_shell,
             check=check,
-            capture_output=True,
-            text=True,
-            executable=shell,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if check else subprocess.DEVNULL,
+            executable=shell if use_shell else None,
+            env={**os.environ, **env} if env else None,
+            input=input.encode() if input is not None else None,
+            cwd=cwd,
         )
 
         if result.returncode == 0:
-            return result.stdout.strip()
+            return result.stdout.decode("utf-8", "replace").strip()
         return None
 
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, FileNotFoundError):
         if check:
             raise
         return None
 
 
+@functools.lru_cache(maxsize=None)
 def command_exists(command_name: str) -> bool:
     """Check if a command is available in the system PATH.
 
+    Results are memoized for the rest of the run; call
+    command_exists.cache_clear() after installing new commands.
+
     Args:
         command_name: Name of the command to check
 
     Returns:
         True if the command exists, False otherwise
     """
-    result = run_command(f"which {command_name}", check=False)
-    return result is not None and result != ""
+    return shutil.which(command_name) is not None
 
 
-# ===== Progress Tracking =====
+# ===== Sudo =====
+
+
+def start_sudo_keepalive() -> None:
+    """Ask for the sudo password once and keep the sudo timestamp fresh.
+
+    Call this before running steps in parallel. Steps that use sudo (cask
+    installers, CLI plugin links) then reuse the cached credentials instead of
+    prompting on the same terminal at the same time. A daemon thread refreshes
+    the timestamp until the process exits.
+    """
+    sudo_command = ["sudo", "-v"]
+    if os.environ.get(NONINTERACTIVE_ENV):
+        # Never wait for a password in non-interactive runs
+        sudo_command.insert(1, "-n")
+
+    if subprocess.run(sudo_command).returncode != 0:
+        print_warning("Could not cache sudo credentials; sudo steps may prompt")
+        return
+
+    def refresh_sudo_timestamp() -> None:
+        while True:
+            time.sleep(SUDO_KEEPALIVE_INTERVAL)
+            subprocess.run(
+                ["sudo", "-n", "-v"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+    threading.Thread(target=refresh_sudo_timestamp, daemon=True).start()
+
+
+# ===== Parallel Execution =====
+
+
+def run_parallel(
+    steps: List[Callable[[], Any]], max_workers: int = PARALLEL_MAX_WORKERS
+) -> None:
+    """Run independent setup steps concurrently and wait for all of them.
+
+    Most setup steps spend their time waiting on the network or on external
+    installers, so running independent ones in threads brings the wall time
+    of a group down to roughly its slowest step.
+
+    Args:
+        steps: Callables without arguments (use lambda or functools.partial)
+        max_workers: Maximum number of steps running at the same time
+
+    Raises:
+        Exception: The first exception raised by a step, after all finished
+
+    Example:
+        >>> run_parallel([setup_pyenv, setup_uv, setup_pipx])
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(step) for step in steps]
+
+    for future in futures:
+        future.result()
+
+
+def run_step_graph(
+    steps: Dict[str, Tuple[Callable[[], Any], List[str]]],
+    max_workers: int = PARALLEL_MAX_WORKERS,
+) -> None:
+    """Run setup steps concurrently while respecting their dependencies.
+
+    Each step starts as soon as all the steps it depends on have finished,
+    so independent chains (e.g. NVM then pnpm, next to pyenv) overlap
+    instead of waiting for a whole phase to complete.
+
+    Args:
+        steps: Mapping of step name to (callable, names of required steps)
+        max_workers: Maximum number of steps running at the same time
+
+    Raises:
+        Exception: The first exception raised by a step; steps that depend
+            on it are not started
+        graphlib.CycleError: If the dependencies contain a cycle
+
+    Example:
+        >>> run_step_graph({
+        ...     "homebrew": (install_homebrew, []),
+        ...     "nvm": (setup_nvm_and_node_lts, ["homebrew"]),
+        ...     "pnpm": (setup_pnpm, ["nvm"]),
+        ...     "uv": (setup_uv, []),
+        ... })
+    """
+    sorter = TopologicalSorter(
+        {name: dependencies for name, (_, dependencies) in steps.items()}
+    )
+    sorter.prepare()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+
+        while sorter.is_active():
+            for name in sorter.get_ready():
+                running[executor.submit(steps[name][0])] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                future.result()
+                sorter.done(name)
+
+
+# ===== Installer Scripts =====
 
 
-def get_completion_flag_path(flag_name: str) -> Path:
-    """Get the path for a completion flag file.
+def fetch_all(urls: Dict[str, str], timeout: float = 30) -> Dict[str, bytes]:
+    """Download several URLs concurrently.
 
-    Flag files are used to track which steps of a multi-stage setup
-    process have been completed, allowing scripts to resume from
-    interruptions.
+    Args:
+        urls: Mapping of name to URL
+        timeout: Seconds to wait on each connection
+
+    Returns:
+        Mapping of name to downloaded content; failed downloads are left out
+    """
+
+    def fetch(url: str) -> bytes:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.read()
+
+    with ThreadPoolExecutor(max_workers=max(len(urls), 1)) as executor:
+        futures = {name: executor.submit(fetch, url) for name, url in urls.items()}
+
+    contents = {}
+    for name, future in futures.items():
+        try:
+            contents[name] = future.result()
+        except (OSError, ValueError) as e:
+            print_warning(f"Could not download {urls[name]}: {e}")
+
+    return contents
+
+
+def prefetch_installer_scripts() -> None:
+    """Load the installer scripts of tools that are not installed yet.
+
+    Scripts bundled by 'make build' are read locally and the others are
+    downloaded concurrently, so later run_installer_script calls can start
+    right away. Installers of tools that are already there are skipped, and
+    nothing waits on this step: run_installer_script downloads a script itself
+    when it hasn't been loaded yet.
+    """
+    with _installer_scripts_lock:
+        pending_names = [
+            name
+            for name in INSTALLER_SCRIPT_URLS
+            if name not in _installer_scripts and not _is_installer_tool_present(name)
+        ]
+
+    scripts = {}
+    missing_urls = {}
+    for name in pending_names:
+        bundled_script = _read_bundled_installer(name)
+        if bundled_script is not None:
+            scripts[name] = bundled_script
+        else:
+            missing_urls[name] = INSTALLER_SCRIPT_URLS[name]
+
+    for name, content in fetch_all(missing_urls).items():
+        scripts[name] = content.decode()
+
+    with _installer_scripts_lock:
+        _installer_scripts.update(scripts)
+
+
+def _is_installer_tool_present(name: str) -> bool:
+    """Check whether the tool an installer script sets up is already there.
 
     Args:
-        flag_name: Unique identifier for the completion flag
+        name: Installer name, a key of INSTALLER_SCRIPT_URLS
+
+    Returns:
+        True if the tool is installed, False otherwise
+    """
+    tool_paths = INSTALLER_TOOL_PATHS.get(name)
+    if tool_paths is None:
+        return command_exists(name)
+    return any(path.exists() for path in tool_paths)
+
+
+def run_installer_script(
+    name: str, shell: str = "/bin/sh", check: bool = True
+) -> Optional[str]:
+    """Run one of the official installer scripts in INSTALLER_SCRIPT_URLS.
+
+    Uses the copy loaded by prefetch_installer_scripts or bundled by
+    'make build' when there is one, downloads the script now otherwise, and
+    falls back to curl if Python cannot download it (e.g. missing CA
+    certificates).
+
+    Args:
+        name: Installer name, a key of INSTALLER_SCRIPT_URLS
+        shell: Shell used to run the script
+        check: If True, raise CalledProcessError on non-zero exit
+
+    Returns:
+        The installer's stdout as a string if successful, None if failed
+    """
+    url = INSTALLER_SCRIPT_URLS[name]
+
+    with _installer_scripts_lock:
+        script = _installer_scripts.get(name)
+
+    if script is None:
+        script = _read_bundled_installer(name)
+
+    if script is None:
+        content = fetch_all({name: url}).get(name)
+        script = content.decode() if content is not None else None
+
+    if script is None:
+        if name in INSTALLER_SCRIPT_SHA256:
+            # curl pipes straight into the shell, so the pin can't be checked
+            print_error(f"Could not download the pinned {name} installer")
+            return None
+        output = run_command(f'{shell} -c "$(curl -fsSL {url})"', check=check)
+    elif _installer_matches_pin(name, script):
+        output = run_command([shell, "-c", script], check=check)
+    else:
+        return None
+
+    # The installer may have added commands that were cached as missing
+    command_exists.cache_clear()
+    return output
+
+
+def _installer_matches_pin(name: str, script: str) -> bool:
+    """Check an installer script against its digest in INSTALLER_SCRIPT_SHA256.
+
+    Args:
+        name: Installer name, a key of INSTALLER_SCRIPT_URLS
+        script: The script's content
+
+    Returns:
+        True if the script is not pinned or matches its pinned digest
+    """
+    expected = INSTALLER_SCRIPT_SHA256.get(name)
+    if expected is None:
+        return True
+
+    actual = hashlib.sha256(script.encode()).hexdigest()
+    if actual != expected.lower():
+        print_error(f"{name} installer sha256 {actual} does not match {expected}")
+        return False
+
+    return True
+
+
+def _read_bundled_installer(name: str) -> Optional[str]:
+    """Read an installer script vendored into the mac-setup.pyz bundle.
+
+    Args:
+        name: Installer name, a key of INSTALLER_SCRIPT_URLS
+
+    Returns:
+        The script's content, or None when running from a source checkout
+    """
+    script_file = resources.files(__package__) / "installers" / f"{name}.sh"
+    if not script_file.is_file():
+        return None
+
+    script = script_file.read_text()
+    digest = hashlib.sha256(script.encode()).hexdigest()
+    print_info(f"Using bundled {name} installer (sha256 {digest})")
+    return script
+
+
+# ===== Progress Tracking =====
+
+
+def _load_completed_steps() -> Dict[str, float]:
+    """Load the completed steps manifest from disk.
 
     Returns:
-        Path object pointing to the flag file location
+        Mapping of step name to completion timestamp (empty if no manifest)
+    """
+    try:
+        return json.loads(STATE_FILE_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_completed_steps() -> None:
+    """Write the completed steps manifest back to disk if it changed.
+
+    Registered with atexit so the manifest is written once per run.
     """
-    flags_directory = Path(tempfile.gettempdir()) / "mac-setup-flags"
-    flags_directory.mkdir(exist_ok=True)
-    return flags_directory / f"{flag_name}.completed"
+    if _completed_steps_changed:
+        content = json.dumps(_completed_steps, indent=2) + "\n"
+        write_text_atomic(STATE_FILE_PATH, content)
+
+
+# Completed steps are loaded once and kept in memory for the whole run
+_completed_steps: Dict[str, float] = _load_completed_steps()
+_completed_steps_changed = False
+atexit.register(_save_completed_steps)
 
 
 def is_step_completed(flag_name: str) -> bool:
     """Check if a setup step has been marked as completed.
 
+    Completed steps are tracked in a single JSON manifest so scripts can
+    resume from interruptions without repeating manual steps.
+
     Args:
         flag_name: Unique identifier for the step
 
     Returns:
         True if the step is marked as completed, False otherwise
     """
-    flag_path = get_completion_flag_path(flag_name)
-    return flag_path.exists()
+    return flag_name in _completed_steps
 
 
 def mark_step_completed(flag_name: str) -> None:
-    """Mark a setup step as completed by creating its flag file.
+    """Mark a setup step as completed in the state manifest.
 
     Args:
         flag_name: Unique identifier for the step
     """
-    flag_path = get_completion_flag_path(flag_name)
-    flag_path.touch()
+    global _completed_steps_changed
+
+    _completed_steps[flag_name] = time.time()
+    _completed_steps_changed = True
     print_success(f"Marked {flag_name} as completed")
 
 
@@ -180,119 +582,288 @@ def cleanup_auto_generated_blocks(config_file_path: str = "") -> None:
     Args:
         config_file_path: Path to the config file (defaults to ~/.zshrc)
     """
-    config_path = Path(config_file_path or f"{os.environ['HOME']}/.zshrc")
-
-    if not config_path.exists():
-        return
-
-    # Read and process the file line by line
-    lines = config_path.read_text().splitlines()
-    cleaned_lines = _remove_auto_generated_sections(lines)
-    consolidated_lines = _remove_consecutive_empty_lines(cleaned_lines)
+    config_path = Path(config_file_path) if config_file_path else ZSHRC
+
+    with shell_config_lock:
+        if not config_path.exists():
+            return
+
+        # Stream the file line by line into a temporary file, dropping
+        # auto-generated sections, then atomically replace the original so an
+        # interrupted run never truncates it
+        with config_path.open() as config_file:
+            cleaned_lines = _remove_auto_generated_sections(
+                line.rstrip("\r\n") for line in config_file
+            )
+            _write_lines_atomic(config_path, cleaned_lines)
 
-    # Write back the cleaned content
-    config_path.write_text("\n".join(consolidated_lines) + "\n")
     print_success(f"Cleaned up auto-generated blocks from {config_path}")
 
 
-def _remove_auto_generated_sections(lines: List[str]) -> List[str]:
-    """Remove lines between auto-generated markers.
+def _remove_auto_generated_sections(lines: Iterable[str]) -> Iterator[str]:
+    """Remove lines between auto-generated markers and collapse blank runs.
+
+    Both are done in a single lazy pass: a blank line is dropped when the
+    last kept line is blank too, so at most one empty line separates content.
 
     Args:
-        lines: List of file lines
+        lines: File lines without line endings
 
-    Returns:
-        List of lines with auto-generated sections removed
+    Yields:
+        Lines with auto-generated sections and repeated blank lines removed
     """
-    cleaned_lines = []
     inside_auto_section = False
+    last_kept_blank = False
 
     for line in lines:
-        if "###### START(AUTO-GENERATED DO NOT EDIT) ######" in line:
+        if _MARK_HINT in line and _START_MARK in line:
             inside_auto_section = True
-        elif "###### END(AUTO-GENERATED DO NOT EDIT) ######" in line:
+        elif _MARK_HINT in line and _END_MARK in line:
             inside_auto_section = False
-        elif not inside_auto_section:
-            cleaned_lines.append(line)
+        elif inside_auto_section:
+            continue
+        elif line or not last_kept_blank:
+            last_kept_blank = not line
+            yield line
 
-    return cleaned_lines
 
+def append_shell_section(
+    description: str, config_lines: List[str], config_file_path: str = ""
+) -> None:
+    """Queue a configuration section with protective markers for shell config.
+
+    This function adds configuration lines wrapped in special markers that
+    identify them as auto-generated content. This allows for safe cleanup
+    and updates without affecting user customizations.
 
-def _remove_consecutive_empty_lines(lines: List[str]) -> List[str]:
-    """Remove consecutive empty lines, keeping at most one.
+    Sections are buffered in memory and written by commit_shell_sections(),
+    so each config file is opened once no matter how many sections the
+    setup adds to it.
 
     Args:
-        lines: List of file lines
+        description: Human-readable description of the section
+        config_lines: List of configuration lines to add
+        config_file_path: Path to the config file (defaults to ~/.zshrc)
+    """
+    append_shell_sections([(description, config_lines)], config_file_path)
+
+
+def append_shell_sections(
+    sections: List[Tuple[str, List[str]]], config_file_path: str = ""
+) -> None:
+    """Queue several configuration sections for the same shell config file.
+
+    Args:
+        sections: List of (description, config_lines) tuples, in file order
+        config_file_path: Path to the config file (defaults to ~/.zshrc)
+
+    Example:
+        >>> append_shell_sections([
+        ...     ("Go", ['export PATH="$PATH:$HOME/go/bin"']),
+        ...     ("Editor", ['export EDITOR="code -w"']),
+        ... ])
+    """
+    config_path = Path(config_file_path) if config_file_path else ZSHRC
+
+    formatted_sections = []
+    for description, config_lines in sections:
+        # Wrap the lines in this section's markers, built in one join
+        section = "\n".join(
+            [
+                f"# {description} {_START_MARK}",
+                *config_lines,
+                f"# {description} {_END_MARK}",
+                "",
+            ]
+        )
+        formatted_sections.append(section)
+
+    with shell_config_lock:
+        _pending_shell_sections.setdefault(config_path, []).extend(formatted_sections)
+
+    for description, _ in sections:
+        print_success(f"Queued section for {config_path}: {description}")
+
+
+def commit_shell_sections() -> None:
+    """Write all queued shell config sections to their config files.
+
+    Each config file is read and written once for all sections queued for it.
+    A section whose START..END block is already in the file is left alone if
+    its text is unchanged and replaced in place otherwise; new sections are
+    appended after a blank line. The file is replaced atomically.
+
+    Also registered with atexit, so sections queued before a failing step
+    are still written when the run is interrupted.
+    """
+    with shell_config_lock:
+        pending_sections = dict(_pending_shell_sections)
+        _pending_shell_sections.clear()
+
+        for config_path, sections in pending_sections.items():
+            try:
+                content = config_path.read_text()
+            except FileNotFoundError:
+                content = ""
+
+            # A section queued more than once keeps its latest text
+            latest_sections = {
+                section.partition("\n")[0]: section for section in sections
+            }
+
+            new_content = content
+            new_sections = []
+            for start_marker, section in latest_sections.items():
+                block = _find_section_block(new_content, section)
+                if block is None:
+                    new_sections.append(section)
+                    continue
+
+                start, end = block
+                if new_content[start:end] == section:
+                    print_success(f"Section already in {config_path}: {start_marker}")
+                else:
+                    new_content = new_content[:start] + section + new_content[end:]
+                    print_success(f"Updated section in {config_path}: {start_marker}")
+
+            if new_sections:
+                # Ensure proper spacing before the new sections
+                padding = _trailing_newline_padding(new_content, count=2)
+                new_content += padding + "\n".join(new_sections)
+
+            if new_content == content:
+                continue
+
+            write_text_atomic(config_path, new_content)
+            if new_sections:
+                print_success(f"Added {len(new_sections)} section(s) to {config_path}")
+
+
+def _find_section_block(content: str, section: str) -> Optional[Tuple[int, int]]:
+    """Locate an existing copy of a section's START..END block in file content.
+
+    Args:
+        content: The config file content
+        section: The formatted section, starting and ending with its markers
 
     Returns:
-        List of lines with consecutive empty lines removed
+        (start, end) offsets of the block including its final newline, or None
+        if the file has no complete block with the section's markers
     """
-    consolidated = []
+    start_marker = section.partition("\n")[0]
+    end_marker = section.rstrip("\n").rpartition("\n")[2]
 
-    for i, line in enumerate(lines):
-        # Keep the line if it's not empty OR if it's the first line OR
-        # if the previous line wasn't empty
-        if line or i == 0 or (i > 0 and lines[i - 1]):
-            consolidated.append(line)
+    start = content.find(start_marker)
+    while start > 0 and content[start - 1] != "\n":
+        start = content.find(start_marker, start + 1)
+    if start == -1:
+        return None
 
-    return consolidated
+    end = content.find(end_marker, start + len(start_marker))
+    if end == -1:
+        return None
 
+    end += len(end_marker)
+    if content.startswith("\n", end):
+        end += 1
+    return start, end
 
-def append_shell_section(
-    description: str, config_lines: List[str], config_file_path: str = ""
-) -> None:
-    """Append a configuration section with protective markers to shell config.
 
-    This function adds configuration lines wrapped in special markers that
-    identify them as auto-generated content. This allows for safe cleanup
-    and updates without affecting user customizations.
+atexit.register(commit_shell_sections)
+
+
+def write_text_atomic(file_path: Path, content: str) -> None:
+    """Replace a file's content atomically using a temporary sibling file.
+
+    Symlinks are followed so dotfile setups keep working, and the original
+    file permissions are preserved.
 
     Args:
-        description: Human-readable description of the section
-        config_lines: List of configuration lines to add
-        config_file_path: Path to the config file (defaults to ~/.zshrc)
+        file_path: Path of the file to write
+        content: The new file content
     """
-    config_path = Path(config_file_path or f"{os.environ['HOME']}/.zshrc")
+    _write_chunks_atomic(file_path, [content])
 
-    # Create markers for this section
-    start_marker = f"# {description} ###### START(AUTO-GENERATED DO NOT EDIT) ######"
-    end_marker = f"# {description} ###### END(AUTO-GENERATED DO NOT EDIT) ######"
 
-    # Read existing content
-    content = config_path.read_text() if config_path.exists() else ""
+def _write_lines_atomic(file_path: Path, lines: Iterable[str]) -> None:
+    """Atomically replace a file with lines, each followed by a newline.
 
-    # Ensure proper spacing before new section
-    content = _ensure_trailing_newlines(content, count=2)
+    The lines are written as they are produced, so the whole new content is
+    never held in memory.
 
-    # Add the new section
-    content += start_marker + "\n"
-    content += "\n".join(config_lines) + "\n"
-    content += end_marker + "\n"
+    Args:
+        file_path: Path of the file to write
+        lines: The new file lines without line endings
+    """
+    _write_chunks_atomic(file_path, (line + "\n" for line in lines))
 
-    config_path.write_text(content)
-    print_success(f"Added section to {config_path}: {description}")
 
+def _write_chunks_atomic(file_path: Path, chunks: Iterable[str]) -> None:
+    """Atomically replace a file with the concatenation of text chunks.
 
-def _ensure_trailing_newlines(content: str, count: int) -> str:
-    """Ensure content ends with the specified number of newlines.
+    Args:
+        file_path: Path of the file to write
+        chunks: Pieces of the new file content, in order
+    """
+    target_path = file_path.resolve()
+
+    with tempfile.NamedTemporaryFile(
+        mode="w", dir=target_path.parent, prefix=f".{target_path.name}.", delete=False
+    ) as tmp_file:
+        tmp_path = Path(tmp_file.name)
+        try:
+            tmp_file.writelines(chunks)
+        except BaseException:
+            tmp_file.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    try:
+        if target_path.exists():
+            shutil.copymode(target_path, tmp_path)
+        else:
+            tmp_path.chmod(0o644)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _trailing_newline_padding(content: str, count: int) -> str:
+    """Return the newlines needed for content to end with ``count`` of them.
 
     Args:
-        content: The text content to process
+        content: The file content that will be appended to
         count: Desired number of trailing newlines
 
     Returns:
-        Content with the correct number of trailing newlines
+        The newlines to append, or "" for empty content
     """
     if not content:
         return ""
 
-    # Strip all trailing newlines and add the desired amount
-    content = content.rstrip("\n")
-    return content + "\n" * count
+    trailing_newlines = len(content) - len(content.rstrip("\n"))
+    return "\n" * max(count - trailing_newlines, 0)
 
 
 # ===== Cron Job Management =====
 
+# Current crontab content, read once by _read_crontab and updated on writes
+_crontab_cache: Optional[str] = None
+
+
+def _read_crontab() -> str:
+    """Get the current user's crontab, running 'crontab -l' only once per run.
+
+    Returns:
+        The crontab content ("" when there is no crontab)
+    """
+    global _crontab_cache
+
+    if _crontab_cache is None:
+        _crontab_cache = run_command(["crontab", "-l"], check=False) or ""
+    return _crontab_cache
+
 
 def clear_crontab() -> bool:
     """Clear all cron jobs for the current user.
@@ -305,20 +876,20 @@ def clear_crontab() -> bool:
     """
     print_info("Clearing crontab...")
 
+    global _crontab_cache
+
     # Check if there's an existing crontab
-    existing_crontab = run_command("crontab -l 2>/dev/null", check=False)
+    existing_crontab = _read_crontab()
 
     if not existing_crontab:
         print_success("Crontab is already empty")
         return True
 
-    # Clear the crontab
-    clear_result = run_command("crontab -r 2>/dev/null", check=False)
+    # Clear the crontab; its exit status tells whether that worked
+    clear_result = run_command(["crontab", "-r"], check=False)
 
-    # Verify it was cleared
-    verification = run_command("crontab -l 2>/dev/null", check=False)
-
-    if clear_result is not None or verification is None:
+    if clear_result is not None:
+        _crontab_cache = ""
         print_success("Crontab cleared successfully")
         return True
     else:
@@ -350,24 +921,55 @@ def setup_cron_job(
         ...     "Daily backup at 9am"
         ... )
     """
-    print_info(f"Setting up cron job: {description or command}")
+    return setup_cron_jobs([(schedule, command, description)], check_exists)
+
+
+def setup_cron_jobs(
+    jobs: List[Tuple[str, str, str]], check_exists: bool = True
+) -> bool:
+    """Setup several cron jobs with a single crontab read and install.
+
+    Args:
+        jobs: List of (schedule, command, description) tuples
+        check_exists: If True, skip jobs whose command is already scheduled
+
+    Returns:
+        True if all cron jobs are installed, False otherwise
+
+    Example:
+        >>> setup_cron_jobs([
+        ...     ("0 9 * * *", "/path/to/backup.sh", "Daily backup at 9am"),
+        ...     ("0 2 * * 0", "/path/to/cleanup.sh", "Weekly cleanup"),
+        ... ])
+    """
+    for _, command, description in jobs:
+        print_info(f"Setting up cron job: {description or command}")
 
     # Get current crontab
-    current_crontab = run_command("crontab -l 2>/dev/null", check=False) or ""
+    current_crontab = _read_crontab()
 
-    # Check if job already exists
-    if check_exists and command in current_crontab:
-        print_success("Cron job already exists")
+    # Prepare entries for the jobs that are not scheduled yet
+    new_jobs = []
+    for schedule, command, description in jobs:
+        if check_exists and command in current_crontab:
+            print_success(f"Cron job already exists: {description or command}")
+        else:
+            new_jobs.append((schedule, command, description))
+
+    if not new_jobs:
         return True
 
-    # Prepare new cron entry
-    cron_entry = _format_cron_entry(schedule, command, description)
+    cron_entries = "".join(
+        _format_cron_entry(schedule, command, description)
+        for schedule, command, description in new_jobs
+    )
 
     # Update crontab
-    success = _update_crontab(current_crontab, cron_entry)
+    success = _update_crontab(current_crontab, cron_entries)
 
     if success:
-        print_success(f"Cron job added: {schedule} {command}")
+        for schedule, command, _ in new_jobs:
+            print_success(f"Cron job added: {schedule} {command}")
     else:
         print_error("Failed to install cron job")
 
@@ -397,28 +999,25 @@ def _update_crontab(current_content: str, new_entry: str) -> bool:
 
     Args:
         current_content: Existing crontab content
-        new_entry: New cron entry to add
+        new_entry: New cron entries to add
 
     Returns:
         True if update was successful, False otherwise
     """
-    # Create temporary file with updated crontab
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file:
-        # Ensure current content ends with newline
-        if current_content and not current_content.endswith("\n"):
-            current_content += "\n"
+    global _crontab_cache
 
-        tmp_file.write(current_content)
-        tmp_file.write(new_entry)
-        tmp_path = tmp_file.name
+    # Ensure current content ends with newline
+    if current_content and not current_content.endswith("\n"):
+        current_content += "\n"
 
-    try:
-        # Install new crontab
-        result = run_command(f"crontab {tmp_path}", check=False)
-        return result is not None
-    finally:
-        # Clean up temporary file
-        Path(tmp_path).unlink(missing_ok=True)
+    # Install the new crontab from stdin, no temporary file needed
+    new_content = current_content + new_entry
+    result = run_command(["crontab", "-"], check=False, input=new_content)
+    if result is None:
+        return False
+
+    _crontab_cache = new_content
+    return True
 
 
 # ===== LaunchAgent Management =====
@@ -460,16 +1059,21 @@ def create_launch_agent(agent_name: str, plist_content: str) -> None:
         >>> create_launch_agent("com.example.backup", plist)
     """
     # Ensure LaunchAgents directory exists
-    launch_agents_dir = Path(f"{os.environ['HOME']}/Library/LaunchAgents")
-    launch_agents_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_launch_agents_dir()
 
     # Write the plist file
-    plist_path = launch_agents_dir / f"{agent_name}.plist"
+    plist_path = LAUNCH_AGENTS_DIR / f"{agent_name}.plist"
     plist_path.write_text(plist_content)
 
     print_success(f"Created LaunchAgent: {plist_path}")
 
 
+@functools.lru_cache(maxsize=None)
+def _ensure_launch_agents_dir() -> None:
+    """Create the LaunchAgents directory, only once per run."""
+    LAUNCH_AGENTS_DIR.mkdir(parents=True, exist_ok=True)
+
+
 # ===== User Input Utilities =====
 
 
@@ -478,6 +1082,7 @@ def prompt_for_user_input(
     valid_responses: Optional[List[str]] = None,
     expected_response: Optional[str] = None,
     case_sensitive: bool = False,
+    default: Optional[str] = None,
 ) -> str:
     """Prompt user for input with optional validation.
 
@@ -486,11 +1091,15 @@ def prompt_for_user_input(
     - Multiple choice (when valid_responses provided)
     - Specific confirmation (when expected_response provided)
 
+    When MAC_SETUP_NONINTERACTIVE is set and a default is given, the default
+    is returned without prompting.
+
     Args:
         message: The prompt message to display
         valid_responses: Optional list of valid responses
         expected_response: Optional single expected response
         case_sensitive: Whether to treat responses as case-sensitive
+        default: Optional response to use in non-interactive runs
 
     Returns:
         The user's response (lowercase by default unless case_sensitive=True)
@@ -512,38 +1121,28 @@ def prompt_for_user_input(
         >>> # Free-form input
         >>> name = prompt_for_user_input("Enter your name")
     """
-    # Initial prompt
-    response = input(f"{Colors.YELLOW}{message}: {Colors.RESET}")
+    if default is not None and os.environ.get(NONINTERACTIVE_ENV):
+        print_info(f"{message}: {default} (non-interactive)")
+        return default
+
+    normalize = (lambda text: text) if case_sensitive else str.lower
+
+    # Build the retry prompt once, outside the validation loop
+    if expected_response:
+        allowed = {normalize(expected_response)}
+        retry_prompt = f"Please type '{expected_response}' to confirm: "
+    elif valid_responses:
+        allowed = {normalize(r) for r in valid_responses}
+        valid_options = "' or '".join(valid_responses)
+        retry_prompt = f"Please type '{valid_options}' to continue: "
+    else:
+        allowed = None
+        retry_prompt = ""
 
-    # Normalize case if not case-sensitive
-    if not case_sensitive:
-        response = response.lower()
-        if valid_responses:
-            valid_responses = [r.lower() for r in valid_responses]
-        if expected_response:
-            expected_response = expected_response.lower()
+    response = normalize(input(f"{Colors.YELLOW}{message}: {Colors.RESET}"))
 
     # Validation loop
-    while True:
-        # Check for expected single response
-        if expected_response and response != expected_response:
-            response = input(
-                f"{Colors.YELLOW}Please type '{expected_response}' to confirm: {Colors.RESET}"
-            )
-            if not case_sensitive:
-                response = response.lower()
-
-        # Check for valid responses list
-        elif valid_responses and response not in valid_responses:
-            valid_options = "' or '".join(valid_responses)
-            response = input(
-                f"{Colors.YELLOW}Please type '{valid_options}' to continue: {Colors.RESET}"
-            )
-            if not case_sensitive:
-                response = response.lower()
-
-        # No validation needed or validation passed
-        else:
-            break
+    while allowed is not None and response not in allowed:
+        response = normalize(input(f"{Colors.YELLOW}{retry_prompt}{Colors.RESET}"))
 
     return response
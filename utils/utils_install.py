@@ -7,11 +7,19 @@ applications on macOS, including Homebrew packages, Mac App Store apps, and
 development environments like Node.js, Python, and Docker.
 """
 
+import atexit
+import json
 import os
+import platform
+import subprocess
+import threading
+from functools import partial
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from .utils_core import (
+    HOME,
+    ZPROFILE,
     append_shell_section,
     command_exists,
     print_error,
@@ -19,10 +27,183 @@ from .utils_core import (
     print_success,
     print_warning,
     run_command,
+    run_installer_script,
+    run_parallel,
+    run_step_graph,
+    write_text_atomic,
 )
 
-# Global cache for Mac App Store installed apps to avoid repeated queries
-_mas_installed_apps_cache: Optional[str] = None
+# Homebrew packages installed by install_default_bundle, one brew call per type
+DEFAULT_FORMULAE = [
+    "autojump",
+    "gh",
+    "mas",  # Mac App Store CLI
+    "watchman",  # File watcher for development tools(expo)
+]
+
+DEFAULT_CASKS = [
+    "iterm2",
+    "visual-studio-code",
+    "font-d2coding",
+    "google-chrome",
+    "raycast",  # Spotlight replacement
+    "jordanbaird-ice",  # Menu bar management
+    "maccy",  # Clipboard manager
+    "aldente",  # Battery charge limiter
+    "obsidian",  # Note-taking
+    "alt-tab",  # Windows-style alt-tab
+    "keka",  # File archiver
+    "appcleaner",  # Uninstall apps completely
+    "google-drive",
+    "shottr",  # Screenshot tool
+    "kap",  # Screen recording tool
+    "discord",  # Communication tool
+    "notion",  # Note-taking and collaboration
+    "android-studio",  # Android development
+]
+
+# Mac App Store apps installed by install_default_bundle, as (app_id, app_name)
+DEFAULT_MAS_APPS = [
+    ("441258766", "Magnet"),  # Window manager
+    ("937984704", "Amphetamine"),  # Keep Mac awake
+    ("869223134", "KakaoTalk"),
+    ("462054704", "Microsoft Word"),
+    ("462058435", "Microsoft Excel"),
+    ("462062816", "Microsoft PowerPoint"),
+    ("497799835", "Xcode"),
+]
+
+# Homebrew lives under /opt/homebrew on Apple Silicon and /usr/local on Intel.
+# An existing /opt/homebrew install wins, since platform.machine() reports
+# x86_64 for Python running under Rosetta; the architecture only decides the
+# prefix for a fresh install.
+if Path("/opt/homebrew/bin/brew").exists() or platform.machine() == "arm64":
+    HOMEBREW_PREFIX = "/opt/homebrew"
+else:
+    HOMEBREW_PREFIX = "/usr/local"
+BREW = f"{HOMEBREW_PREFIX}/bin/brew"
+
+# Directory NVM keeps its Node.js versions in
+NVM_DIR = HOME / ".nvm"
+
+# Directory the Docker CLI loads plugins such as docker-compose from
+DOCKER_CLI_PLUGINS_DIR = "/usr/local/lib/docker/cli-plugins"
+
+# Number of parallel bottle downloads Homebrew may use for batched installs
+BREW_DOWNLOAD_CONCURRENCY = "10"
+
+# Global cache of installed Mac App Store app IDs to avoid repeated queries
+_mas_installed_apps_cache: Optional[Set[str]] = None
+
+# Global cache of installed Homebrew packages, keyed by 'formula' or 'cask'
+_brew_installed_packages_cache: Dict[str, Set[str]] = {}
+
+# Global cache of whether Colima is running, to avoid repeated 'colima status'
+_colima_running_cache: Optional[bool] = None
+
+# Homebrew refuses concurrent installs and fetches, and mas concurrent installs,
+# so parallel steps take turns
+_brew_install_lock = threading.Lock()
+_mas_install_lock = threading.Lock()
+
+# Background 'brew update' started by start_brew_update, if any
+_brew_update_process: Optional[subprocess.Popen] = None
+
+# Installed package lists saved by previous runs
+INSTALLED_PACKAGES_CACHE_PATH = HOME / ".local/state/mac-setup/installed_packages.json"
+
+# Directories whose mtime changes when packages of each kind are added or removed
+PACKAGE_INSTALL_DIRS = {
+    "formula": f"{HOMEBREW_PREFIX}/Cellar",
+    "cask": f"{HOMEBREW_PREFIX}/Caskroom",
+    "mas": "/Applications",
+}
+
+
+def _install_dir_signature(kind: str) -> Optional[int]:
+    """
+    Get the mtime of the directory packages of one kind are installed into.
+
+    Args:
+        kind: Either 'formula', 'cask' or 'mas'
+
+    Returns:
+        Optional[int]: The directory mtime in nanoseconds, or None if missing
+    """
+    try:
+        return os.stat(PACKAGE_INSTALL_DIRS[kind]).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_installed_packages_cache() -> Dict[str, dict]:
+    """
+    Load the installed package lists saved by previous runs.
+
+    Returns:
+        Dict[str, dict]: Mapping of package kind to its directory mtime and names
+    """
+    try:
+        return json.loads(INSTALLED_PACKAGES_CACHE_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _load_saved_packages(kind: str) -> Optional[Set[str]]:
+    """
+    Reuse a saved installed package list if its directory is unchanged.
+
+    Call this right before listing packages of the given kind; the directory
+    mtime seen here decides whether the list may be saved again at exit.
+
+    Args:
+        kind: Either 'formula', 'cask' or 'mas'
+
+    Returns:
+        Optional[Set[str]]: The saved package names, or None if they are stale
+    """
+    signature = _install_dir_signature(kind)
+    _listed_signatures[kind] = signature
+
+    saved = _saved_installed_packages.get(kind)
+    if signature is not None and saved and saved.get("mtime_ns") == signature:
+        return set(saved["packages"])
+    return None
+
+
+def _save_installed_packages_cache() -> None:
+    """
+    Write the installed package lists back to disk if they changed.
+
+    A list is only saved while its directory is unchanged since it was listed.
+    Packages installed during the run change the mtime, so the next run lists
+    them again and picks up their dependencies as well.
+
+    Registered with atexit so the cache is written once per run.
+    """
+    listed_packages = dict(_brew_installed_packages_cache)
+    if _mas_installed_apps_cache is not None:
+        listed_packages["mas"] = _mas_installed_apps_cache
+
+    saved = dict(_saved_installed_packages)
+    for kind, packages in listed_packages.items():
+        signature = _install_dir_signature(kind)
+        if signature is not None and signature == _listed_signatures.get(kind):
+            saved[kind] = {"mtime_ns": signature, "packages": sorted(packages)}
+        else:
+            saved.pop(kind, None)
+
+    if saved != _saved_installed_packages:
+        INSTALLED_PACKAGES_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps(saved, indent=2) + "\n"
+        write_text_atomic(INSTALLED_PACKAGES_CACHE_PATH, content)
+
+
+# Saved lists are reused until Homebrew or the App Store changes the directory
+# the packages live in
+_saved_installed_packages: Dict[str, dict] = _load_installed_packages_cache()
+_listed_signatures: Dict[str, Optional[int]] = {}
+atexit.register(_save_installed_packages_cache)
 
 
 def install_homebrew() -> None:
@@ -38,33 +219,70 @@ def install_homebrew() -> None:
     # First, ensure Homebrew is configured in shell profile
     _configure_homebrew_shell()
 
-    if command_exists("brew"):
+    if Path(BREW).exists():
         print_success("Homebrew is already installed")
+        _load_homebrew_env()
+        start_brew_update()
         return
 
     print_info("Installing Homebrew...")
 
-    # Download and run the official Homebrew installation script
-    install_script_url = (
-        "https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh"
-    )
-    run_command(f'/bin/bash -c "$(curl -fsSL {install_script_url})"')
+    # Run the official Homebrew installation script
+    run_installer_script("homebrew", shell="/bin/bash")
 
     # Load Homebrew environment for current session
-    run_command('eval "$(/opt/homebrew/bin/brew shellenv)"')
+    _load_homebrew_env()
 
     print_success("Homebrew installed successfully")
 
 
+def _load_homebrew_env() -> None:
+    """Put Homebrew on this process's PATH, like 'eval "$(brew shellenv)"'."""
+    brew_dirs = [f"{HOMEBREW_PREFIX}/bin", f"{HOMEBREW_PREFIX}/sbin"]
+    path_dirs = os.environ.get("PATH", "").split(os.pathsep)
+
+    os.environ["HOMEBREW_PREFIX"] = HOMEBREW_PREFIX
+    os.environ["PATH"] = os.pathsep.join(
+        brew_dirs + [path_dir for path_dir in path_dirs if path_dir not in brew_dirs]
+    )
+    command_exists.cache_clear()
+
+
+def start_brew_update() -> None:
+    """
+    Refresh Homebrew's package index in the background.
+
+    The update runs while other setup steps proceed, and auto-update is turned
+    off for the rest of the run so each brew install no longer refreshes the
+    index itself. Brew commands that install or fetch packages wait for the
+    background update to finish first.
+    """
+    global _brew_update_process
+
+    if _brew_update_process is not None:
+        return
+
+    _brew_update_process = subprocess.Popen(
+        [BREW, "update", "--quiet"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    os.environ["HOMEBREW_NO_AUTO_UPDATE"] = "1"
+
+
+def _wait_for_brew_update() -> None:
+    """Block until the background 'brew update' has finished, if one is running."""
+    if _brew_update_process is not None:
+        _brew_update_process.wait()
+
+
 def _configure_homebrew_shell() -> None:
     """Configure Homebrew in the shell profile for future sessions."""
-    homebrew_config = ['eval "$(/opt/homebrew/bin/brew shellenv)"']
-    profile_path = f"{os.environ['HOME']}/.zprofile"
-
+    homebrew_config = [f'eval "$({BREW} shellenv)"']
     append_shell_section(
         description="Homebrew setup",
         config_lines=homebrew_config,
-        config_file_path=profile_path,
+        config_file_path=str(ZPROFILE),
     )
 
 
@@ -72,6 +290,9 @@ def install_brew_package(package: str, package_type: str = "formula") -> bool:
     """
     Install a single Homebrew package or cask.
 
+    This is a thin wrapper around the batched install path used by
+    install_brew_packages.
+
     Args:
         package: The name of the package to install (e.g., 'git', 'visual-studio-code')
         package_type: Type of package - either 'formula' or 'cask'
@@ -93,11 +314,7 @@ def install_brew_package(package: str, package_type: str = "formula") -> bool:
         )
         return False
 
-    if _is_package_installed(package, package_type):
-        print_success(f"{package} is already installed")
-        return True
-
-    return _perform_brew_installation(package, package_type)
+    return _install_brew_batch([package], package_type)
 
 
 def _is_valid_package_type(package_type: str) -> bool:
@@ -105,59 +322,263 @@ def _is_valid_package_type(package_type: str) -> bool:
     return package_type in ("formula", "cask")
 
 
-def _is_package_installed(package: str, package_type: str) -> bool:
+def _list_installed_packages(package_type: str) -> Set[str]:
     """
-    Check if a Homebrew package is already installed.
+    List the names of all installed Homebrew formulae or casks.
+
+    Uses a global cache so brew is only queried once per package type, and
+    reuses the list saved by a previous run while the Cellar or Caskroom is
+    unchanged. brew is not run at all while that directory is empty.
 
     Args:
-        package: Package name to check
         package_type: Either 'formula' or 'cask'
 
     Returns:
-        bool: True if package is installed, False otherwise
+        Set[str]: Installed package names (empty if listing fails)
     """
-    list_command = "brew list"
-    if package_type == "cask":
-        list_command += " --cask"
+    if package_type not in _brew_installed_packages_cache:
+        saved_packages = _load_saved_packages(package_type)
+        if saved_packages is not None:
+            _brew_installed_packages_cache[package_type] = saved_packages
+            return saved_packages
+
+        # A fresh Homebrew install has nothing in its Cellar or Caskroom yet,
+        # so there is no need to start brew just to list nothing
+        if not _has_directory_entries(PACKAGE_INSTALL_DIRS[package_type]):
+            _brew_installed_packages_cache[package_type] = set()
+            return _brew_installed_packages_cache[package_type]
+
+        list_command = [BREW, "list", f"--{package_type}", "-1"]
+
+        try:
+            installed_packages = run_command(list_command, check=False)
+        except Exception:
+            # If listing fails, we'll proceed with installation attempt
+            installed_packages = None
+
+        _brew_installed_packages_cache[package_type] = set(
+            (installed_packages or "").split()
+        )
+
+    return _brew_installed_packages_cache[package_type]
+
 
+def _has_directory_entries(directory: str) -> bool:
+    """
+    Check whether a directory exists and contains at least one entry.
+
+    Args:
+        directory: Path of the directory to check
+
+    Returns:
+        bool: True if the directory has entries, False if it is empty or missing
+    """
     try:
-        installed_packages = run_command(list_command)
-        if installed_packages and package in installed_packages.split():
-            return True
-    except Exception:
-        # If listing fails, we'll proceed with installation attempt
-        pass
+        with os.scandir(directory) as entries:
+            return next(entries, None) is not None
+    except OSError:
+        return False
+
 
-    return False
+def _record_installed_packages(packages: List[str], package_type: str) -> None:
+    """
+    Update cached Homebrew state after packages were installed.
 
+    The new packages are added to the cached 'brew list' result instead of
+    listing everything again.
 
-def _perform_brew_installation(package: str, package_type: str) -> bool:
+    Args:
+        packages: Package names that were just installed
+        package_type: Either 'formula' or 'cask'
     """
-    Perform the actual Homebrew package installation.
+    installed_packages = _brew_installed_packages_cache.get(package_type)
+    if installed_packages is not None:
+        installed_packages.update(packages)
+
+    command_exists.cache_clear()
+
+
+def install_brew_packages(
+    formulae: List[str], casks: Optional[List[str]] = None
+) -> bool:
+    """
+    Install several Homebrew formulae and casks with batched brew invocations.
+
+    Already installed packages are filtered out up front, then all remaining
+    formulae are installed with a single 'brew install' and all remaining casks
+    with a single 'brew install --cask'. Homebrew resolves the dependency graph
+    once and downloads bottles in parallel instead of once per package.
 
     Args:
-        package: Package name to install
+        formulae: Names of formulae (command-line tools and libraries)
+        casks: Optional names of casks (GUI applications)
+
+    Returns:
+        bool: True if all packages are installed, False otherwise
+
+    Examples:
+        >>> install_brew_packages(["gh", "watchman"], ["iterm2", "raycast"])
+        True
+    """
+    formulae_installed = _install_brew_batch(formulae, "formula")
+    casks_installed = _install_brew_batch(casks or [], "cask")
+    return formulae_installed and casks_installed
+
+
+def prefetch_brew_packages(
+    formulae: List[str], casks: Optional[List[str]] = None
+) -> None:
+    """
+    Download Homebrew bottles and casks ahead of time without installing them.
+
+    Running this while other setup steps are busy moves the download time out
+    of a later install_brew_packages call, which then installs straight from
+    Homebrew's download cache. Failures are ignored since the install step
+    downloads anything that is still missing.
+
+    Args:
+        formulae: Names of formulae to download
+        casks: Optional names of casks to download
+
+    Examples:
+        >>> prefetch_brew_packages(["gh", "watchman"], ["iterm2", "raycast"])
+    """
+    for packages, package_type in ((formulae, "formula"), (casks or [], "cask")):
+        missing_packages = _find_missing_packages(packages, package_type)
+        if not missing_packages:
+            continue
+
+        print_info(f"Prefetching {', '.join(missing_packages)}...")
+        _wait_for_brew_update()
+        # Fetches share the download cache and its locks with installs
+        with _brew_install_lock:
+            run_command(
+                _build_brew_command("fetch", missing_packages, package_type),
+                check=False,
+                env={"HOMEBREW_DOWNLOAD_CONCURRENCY": BREW_DOWNLOAD_CONCURRENCY},
+            )
+
+
+def prescan_installed_packages() -> None:
+    """
+    Load the installed formulae, casks, and Mac App Store apps concurrently.
+
+    This warms the caches behind every "already installed" check, so later
+    install helpers can skip installed packages without running brew or mas.
+    """
+    probes = [
+        partial(_list_installed_packages, "formula"),
+        partial(_list_installed_packages, "cask"),
+    ]
+    if command_exists("mas"):
+        probes.append(_list_installed_mas_apps)
+
+    run_parallel(probes)
+
+
+def install_default_bundle() -> None:
+    """
+    Install the default formulae, casks, and Mac App Store apps.
+
+    Bottles for all missing formulae and casks are prefetched first. Casks then
+    install while the Mac App Store apps wait only for the formulae, which
+    provide the 'mas' CLI.
+    """
+    run_step_graph(
+        {
+            "prefetch": (
+                partial(prefetch_brew_packages, DEFAULT_FORMULAE, DEFAULT_CASKS),
+                [],
+            ),
+            "formulae": (
+                partial(install_brew_packages, DEFAULT_FORMULAE),
+                ["prefetch"],
+            ),
+            "casks": (partial(install_brew_packages, [], DEFAULT_CASKS), ["prefetch"]),
+            "mas_apps": (partial(install_mas_apps, DEFAULT_MAS_APPS), ["formulae"]),
+        }
+    )
+
+
+def _install_brew_batch(packages: List[str], package_type: str) -> bool:
+    """
+    Install all missing packages of one type with a single brew command.
+
+    Args:
+        packages: Package names to install
         package_type: Either 'formula' or 'cask'
 
     Returns:
-        bool: True if installation succeeded, False otherwise
+        bool: True if all packages are installed, False otherwise
     """
-    install_command = "brew install"
-    if package_type == "cask":
-        install_command += " --cask"
-    install_command += f" {package}"
+    if not packages:
+        return True
+
+    missing_packages = _find_missing_packages(packages, package_type)
+    for package in dict.fromkeys(packages):
+        if package not in missing_packages:
+            print_success(f"{package} is already installed")
+
+    if not missing_packages:
+        return True
 
-    print_info(f"Installing {package}...")
-    result = run_command(install_command)
+    print_info(f"Installing {', '.join(missing_packages)}...")
+    _wait_for_brew_update()
+    with _brew_install_lock:
+        result = run_command(
+            _build_brew_command("install", missing_packages, package_type),
+            check=False,
+            env={"HOMEBREW_DOWNLOAD_CONCURRENCY": BREW_DOWNLOAD_CONCURRENCY},
+        )
 
     if result is not None:
-        print_success(f"Installed {package}")
+        _record_installed_packages(missing_packages, package_type)
+        print_success(f"Installed {', '.join(missing_packages)}")
         return True
     else:
-        print_error(f"Failed to install {package}")
+        print_error(f"Failed to install {', '.join(missing_packages)}")
         return False
 
 
+def _find_missing_packages(packages: List[str], package_type: str) -> List[str]:
+    """
+    Filter a package list down to the packages that are not installed yet.
+
+    Args:
+        packages: Package names to check
+        package_type: Either 'formula' or 'cask'
+
+    Returns:
+        List[str]: Missing package names in their original order, deduplicated
+    """
+    installed_packages = _list_installed_packages(package_type)
+    return [
+        package
+        for package in dict.fromkeys(packages)
+        if package not in installed_packages
+    ]
+
+
+def _build_brew_command(
+    subcommand: str, packages: List[str], package_type: str
+) -> List[str]:
+    """
+    Build a brew argument list operating on one or more packages.
+
+    Args:
+        subcommand: The brew subcommand (e.g., 'install' or 'fetch')
+        packages: Package names to pass to brew
+        package_type: Either 'formula' or 'cask'
+
+    Returns:
+        List[str]: The brew command as an argument list
+    """
+    brew_command = [BREW, subcommand]
+    if package_type == "cask":
+        brew_command.append("--cask")
+    return brew_command + packages
+
+
 def install_mas_app(app_id: str, app_name: str) -> bool:
     """
     Install a Mac App Store application using the mas CLI tool.
@@ -189,6 +610,54 @@ def install_mas_app(app_id: str, app_name: str) -> bool:
     return _perform_mas_installation(app_id, app_name)
 
 
+def install_mas_apps(apps: List[Tuple[str, str]]) -> bool:
+    """
+    Install several Mac App Store applications with a single mas invocation.
+
+    Already installed apps are skipped using one cached 'mas list', and the
+    remaining apps are passed to one 'mas install' so the App Store is only
+    contacted once for the whole batch.
+
+    Args:
+        apps: List of (app_id, app_name) tuples to install
+
+    Returns:
+        bool: True if all apps are installed, False otherwise
+
+    Examples:
+        >>> install_mas_apps([("441258766", "Magnet"), ("497799835", "Xcode")])
+        True
+    """
+    if not _validate_mas_cli():
+        return False
+
+    missing_apps = []
+    for app_id, app_name in apps:
+        if _is_mas_app_installed(app_id):
+            print_success(f"{app_name} is already installed")
+        else:
+            missing_apps.append((app_id, app_name))
+
+    if not missing_apps:
+        return True
+
+    for _, app_name in missing_apps:
+        print_info(f"Installing {app_name} from Mac App Store...")
+
+    app_ids = [app_id for app_id, _ in missing_apps]
+    app_names = ", ".join(app_name for _, app_name in missing_apps)
+    with _mas_install_lock:
+        result = run_command(["mas", "install", *app_ids], check=False)
+
+    if result is not None:
+        print_success(f"Installed {app_names}")
+        _list_installed_mas_apps().update(app_ids)
+        return True
+    else:
+        print_error(f"Failed to install {app_names}")
+        return False
+
+
 def _validate_mas_cli() -> bool:
     """Check if mas CLI is available."""
     if not command_exists("mas"):
@@ -203,13 +672,30 @@ def _is_mas_app_installed(app_id: str) -> bool:
 
     Uses a global cache to avoid repeated queries to mas list.
     """
+    return app_id in _list_installed_mas_apps()
+
+
+def _list_installed_mas_apps() -> Set[str]:
+    """
+    List the IDs of all installed Mac App Store apps.
+
+    Uses a global cache so mas is only queried once per session; apps
+    installed later in the run are added to it directly. The list saved by a
+    previous run is reused while /Applications is unchanged.
+    """
     global _mas_installed_apps_cache
 
-    # Load installed apps list once per session
     if _mas_installed_apps_cache is None:
-        _mas_installed_apps_cache = run_command("mas list") or ""
+        _mas_installed_apps_cache = _load_saved_packages("mas")
+
+    if _mas_installed_apps_cache is None:
+        # Each 'mas list' line starts with the app ID, e.g. "497799835  Xcode (15.0)"
+        installed_apps = run_command(["mas", "list"]) or ""
+        _mas_installed_apps_cache = {
+            line.split()[0] for line in installed_apps.splitlines() if line.strip()
+        }
 
-    return app_id in _mas_installed_apps_cache
+    return _mas_installed_apps_cache
 
 
 def _perform_mas_installation(app_id: str, app_name: str) -> bool:
@@ -223,15 +709,13 @@ def _perform_mas_installation(app_id: str, app_name: str) -> bool:
     Returns:
         bool: True if installation succeeded, False otherwise
     """
-    global _mas_installed_apps_cache
-
     print_info(f"Installing {app_name} from Mac App Store...")
-    result = run_command(f"mas install {app_id}", check=False)
+    with _mas_install_lock:
+        result = run_command(["mas", "install", app_id], check=False)
 
     if result is not None:
         print_success(f"Installed {app_name}")
-        # Update cache to reflect new installation
-        _mas_installed_apps_cache = run_command("mas list") or _mas_installed_apps_cache
+        _list_installed_mas_apps().add(app_id)
         return True
     else:
         print_error(f"Failed to install {app_name}")
@@ -264,8 +748,11 @@ def setup_nvm_and_node_lts() -> None:
     install_brew_package("nvm")
     print_success("NVM configuration added")
 
-    # Install Node.js LTS version
-    _install_node_lts()
+    # Install Node.js LTS version unless NVM already manages a Node.js install
+    if _has_nvm_node_versions():
+        print_success("Node.js is already installed with NVM")
+    else:
+        _install_node_lts()
 
     print_info(
         "NVM installed and configured. Please run 'source ~/.zshrc' in your terminal to use nvm."
@@ -274,16 +761,15 @@ def setup_nvm_and_node_lts() -> None:
 
 def _create_nvm_directory() -> None:
     """Create the NVM directory if it doesn't exist."""
-    nvm_dir = Path(f"{os.environ['HOME']}/.nvm")
-    nvm_dir.mkdir(exist_ok=True)
+    NVM_DIR.mkdir(exist_ok=True)
 
 
 def _configure_nvm_shell() -> None:
     """Add NVM configuration to shell profile."""
     nvm_config_lines = [
         'export NVM_DIR="$HOME/.nvm"',
-        '[ -s "/opt/homebrew/opt/nvm/nvm.sh" ] && \\. "/opt/homebrew/opt/nvm/nvm.sh"',
-        '[ -s "/opt/homebrew/opt/nvm/etc/bash_completion.d/nvm" ] && \\. "/opt/homebrew/opt/nvm/etc/bash_completion.d/nvm"',
+        f'[ -s "{HOMEBREW_PREFIX}/opt/nvm/nvm.sh" ] && \\. "{HOMEBREW_PREFIX}/opt/nvm/nvm.sh"',
+        f'[ -s "{HOMEBREW_PREFIX}/opt/nvm/etc/bash_completion.d/nvm" ] && \\. "{HOMEBREW_PREFIX}/opt/nvm/etc/bash_completion.d/nvm"',
     ]
 
     append_shell_section(
@@ -292,11 +778,24 @@ def _configure_nvm_shell() -> None:
     )
 
 
+def _has_nvm_node_versions() -> bool:
+    """
+    Check whether NVM already has at least one Node.js version installed.
+
+    Looking at the NVM versions directory avoids sourcing nvm.sh in a shell
+    and letting 'nvm install --lts' contact the Node.js release index.
+    """
+    try:
+        return any((NVM_DIR / "versions" / "node").iterdir())
+    except OSError:
+        return False
+
+
 def _install_node_lts() -> None:
     """Install the latest Node.js LTS version using NVM."""
-    nvm_script = """
+    nvm_script = f"""
     export NVM_DIR="$HOME/.nvm"
-    [ -s "/opt/homebrew/opt/nvm/nvm.sh" ] && \\. "/opt/homebrew/opt/nvm/nvm.sh"
+    [ -s "{HOMEBREW_PREFIX}/opt/nvm/nvm.sh" ] && \\. "{HOMEBREW_PREFIX}/opt/nvm/nvm.sh"
     nvm install --lts
     """
     run_command(nvm_script)
@@ -315,17 +814,35 @@ def setup_pnpm() -> None:
     """
     print_info("Setting up pnpm...")
 
-    # Update Corepack to latest version
-    run_command("npm install --global corepack@latest", check=False)
-
-    # Enable pnpm in Corepack
-    run_command("corepack enable pnpm", check=False)
+    # Skip the slow npm/corepack chain when pnpm is already available
+    if command_exists("pnpm"):
+        version = run_command(["pnpm", "--version"], check=False)
+        if version:
+            print_success(f"pnpm {version} is already installed")
+            return
+
+    # Load Node.js from NVM, update Corepack, enable pnpm, activate the latest
+    # pnpm version and verify the installation in one shell. The chain stops
+    # at the first failing step, and only 'pnpm --version' writes to stdout.
+    pnpm_script = " && ".join(
+        [
+            'export NVM_DIR="$HOME/.nvm"',
+            f'\\. "{HOMEBREW_PREFIX}/opt/nvm/nvm.sh"',
+            "npm install --global corepack@latest >/dev/null",
+            "corepack enable pnpm >/dev/null",
+            "corepack prepare pnpm@latest --activate >/dev/null",
+            "pnpm --version",
+        ]
+    )
 
-    # Prepare and activate the latest pnpm version
-    run_command("corepack prepare pnpm@latest --activate", check=False)
+    try:
+        version = run_command(pnpm_script)
+    except subprocess.CalledProcessError as e:
+        error_lines = e.stderr.decode("utf-8", "replace").strip().splitlines()
+        reason = error_lines[-1] if error_lines else f"exit status {e.returncode}"
+        print_error(f"pnpm setup failed: {reason}")
+        return
 
-    # Verify installation
-    version = run_command("pnpm --version", check=False)
     if version:
         print_success(f"pnpm {version} installed")
     else:
@@ -389,9 +906,8 @@ def setup_uv() -> None:
 
     print_info("Installing uv...")
 
-    # Download and run the official uv installation script
-    install_script_url = "https://astral.sh/uv/install.sh"
-    run_command(f"curl -LsSf {install_script_url} | sh")
+    # Run the official uv installation script
+    run_installer_script("uv")
 
     print_success("uv installed successfully")
 
@@ -419,7 +935,7 @@ def setup_pipx() -> None:
     install_brew_package("pipx")
 
     # Ensure pipx paths are properly configured
-    run_command("pipx ensurepath")
+    run_command(["pipx", "ensurepath"])
 
     print_success("pipx installed successfully")
     print_info("You can now install Python applications with 'pipx install'")
@@ -448,7 +964,7 @@ def setup_docker_cli_colima() -> None:
     """
     print_info("Setting up Docker CLI with Colima...")
 
-    # Install Docker CLI and related tools
+    # Install Docker CLI, Docker Compose and Colima
     _install_docker_tools()
 
     # Install and configure Colima
@@ -458,20 +974,34 @@ def setup_docker_cli_colima() -> None:
 
 
 def _install_docker_tools() -> None:
-    """Install Docker CLI and Docker Compose."""
-    install_brew_package("docker", "formula")
-    install_brew_package("docker-compose", "formula")
-    
-    # Setup Docker Compose as a Docker CLI plugin
+    """Install Docker CLI, Docker Compose and Colima with one brew call."""
+    install_brew_packages(["docker", "docker-compose", "colima"])
+
+
+def setup_docker_compose_plugin() -> None:
+    """
+    Link Docker Compose into the Docker CLI plugins directory.
+
+    This needs sudo, so it runs after the parallel install steps instead of
+    inside setup_docker_cli_colima, where its password prompt could collide
+    with cask installers prompting at the same time.
+    """
     print_info("Setting up Docker Compose as a CLI plugin...")
-    run_command("sudo mkdir -p /usr/local/lib/docker/cli-plugins")
-    run_command("sudo ln -sf /opt/homebrew/bin/docker-compose /usr/local/lib/docker/cli-plugins/docker-compose")
+    run_command(["sudo", "mkdir", "-p", DOCKER_CLI_PLUGINS_DIR])
+    run_command(
+        [
+            "sudo",
+            "ln",
+            "-sf",
+            f"{HOMEBREW_PREFIX}/bin/docker-compose",
+            f"{DOCKER_CLI_PLUGINS_DIR}/docker-compose",
+        ]
+    )
 
 
 def _setup_colima() -> None:
-    """Install and start Colima with optimized settings."""
-    # Install Colima
-    install_brew_package("colima", "formula")
+    """Start Colima with optimized settings."""
+    global _colima_running_cache
 
     # Check if Colima is already running
     if _is_colima_running():
@@ -480,10 +1010,26 @@ def _setup_colima() -> None:
 
     # Start Colima with specified resources
     print_info("Starting Colima with 4 CPUs and 8GB memory...")
-    run_command("colima start --cpu 4 --memory 8")
+    if run_command(["colima", "start", "--cpu", "4", "--memory", "8"]) is not None:
+        _colima_running_cache = True
 
 
 def _is_colima_running() -> bool:
-    """Check if Colima is currently running."""
-    colima_status = run_command("colima status", check=False)
-    return colima_status is not None and "Running" in colima_status
+    """
+    Check if Colima is currently running.
+
+    The result is cached, and 'colima status' is not run at all when the colima
+    binary is missing.
+    """
+    global _colima_running_cache
+
+    if _colima_running_cache is None:
+        if command_exists("colima"):
+            colima_status = run_command(["colima", "status"], check=False)
+            _colima_running_cache = (
+                colima_status is not None and "Running" in colima_status
+            )
+        else:
+            _colima_running_cache = False
+
+    return _colima_running_cache
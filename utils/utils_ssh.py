@@ -9,16 +9,23 @@ This module provides comprehensive SSH key management functionality including:
 - GitHub SSH configuration and testing
 """
 
+import atexit
+import json
+import mmap
 import os
+import re
 import secrets
 import string
 import subprocess
 import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from .utils_core import (
+    HOME,
+    SSH_DIR,
     Colors,
     command_exists,
     print_info,
@@ -27,6 +34,7 @@ from .utils_core import (
     prompt_for_user_input,
     run_command,
     setup_cron_job,
+    write_text_atomic,
 )
 
 # Constants
@@ -36,13 +44,33 @@ SSH_CONFIG_MARKER = "# Configured by mac-setup"
 BACKUP_DIR_PATH = "Library/Mobile Documents/com~apple~CloudDocs/Backup/ssh"
 BACKUP_RETENTION_COUNT = 4
 PASSWORD_LENGTH = 32
+SSH_KEY_CHECK_WORKERS = 8  # Upper bound on concurrent ssh-keygen checks
+GITHUB_SSH_TIMEOUT = 10  # Seconds to wait on ssh-keyscan and the test login
 
+# Key fingerprints remembered across runs, see _get_ssh_key_fingerprints
+FINGERPRINT_CACHE_PATH = HOME / ".local/state/mac-setup/ssh_fingerprints.json"
 
-def _create_askpass_script(password: str) -> Path:
+# Askpass helper printing the passphrase handed to it through its environment,
+# so the passphrase itself is never written to disk
+ASKPASS_PASSWORD_ENV = "MAC_SETUP_SSH_PASSPHRASE"
+ASKPASS_SCRIPT = f"""#!/bin/sh
+printf '%s\\n' "${ASKPASS_PASSWORD_ENV}"
+"""
+
+# Fingerprints of the keys loaded in ssh-agent, read once by
+# _list_agent_fingerprints and kept up to date as keys are added
+_agent_fingerprints: Optional[Set[str]] = None
+
+# Variables printed by 'ssh-agent -s', e.g. "SSH_AUTH_SOCK=/tmp/...; export ..."
+_SSH_AGENT_ENV_RE = re.compile(r"(SSH_AUTH_SOCK|SSH_AGENT_PID)=([^;]+);")
+
+
+def _create_askpass_script() -> Path:
     """Create a temporary askpass script for SSH key operations.
 
-    Args:
-        password: The password to embed in the askpass script
+    The script holds no secret: it prints the password passed in the
+    ASKPASS_PASSWORD_ENV environment variable of the ssh-add or ssh-keygen
+    process.
 
     Returns:
         Path to the created askpass script
@@ -50,12 +78,8 @@ def _create_askpass_script(password: str) -> Path:
     Note:
         The caller is responsible for cleaning up the created file.
     """
-    askpass_content = f"""#!/bin/bash
-echo '{password}'
-"""
-
     with tempfile.NamedTemporaryFile(mode="w", suffix=".sh", delete=False) as tmp_file:
-        tmp_file.write(askpass_content)
+        tmp_file.write(ASKPASS_SCRIPT)
         askpass_path = Path(tmp_file.name)
 
     # Make the script executable
@@ -73,25 +97,14 @@ def _add_key_to_agent_with_password(key_path: Path, password: str) -> bool:
     Returns:
         True if the key was successfully added, False otherwise
     """
-    askpass_path = _create_askpass_script(password)
+    askpass_path = _create_askpass_script()
 
     try:
-        # Configure environment for SSH_ASKPASS
-        env = os.environ.copy()
-        env.update(
-            {
-                "DISPLAY": "1",  # Required for SSH_ASKPASS to work
-                "SSH_ASKPASS": str(askpass_path),
-                "SSH_ASKPASS_REQUIRE": "force",
-            }
-        )
-
         # Add key to agent with macOS keychain support
         result = subprocess.run(
             ["ssh-add", "--apple-use-keychain", str(key_path)],
-            env=env,
+            env=_askpass_env(askpass_path, password),
             capture_output=True,
-            text=True,
         )
         return result.returncode == 0
 
@@ -100,6 +113,165 @@ def _add_key_to_agent_with_password(key_path: Path, password: str) -> bool:
         askpass_path.unlink(missing_ok=True)
 
 
+def _askpass_env(askpass_path: Path, password: str) -> Dict[str, str]:
+    """Build the environment that makes ssh tools read a password via askpass.
+
+    The password travels in the child's environment, which only the same user
+    can read, instead of in its argv, which any local user can see with ps.
+
+    Args:
+        askpass_path: Path to the script created by _create_askpass_script
+        password: Password the askpass script should print
+
+    Returns:
+        A copy of os.environ with the askpass settings added
+    """
+    env = os.environ.copy()
+    env.update(
+        {
+            "DISPLAY": "1",  # Required for SSH_ASKPASS to work
+            "SSH_ASKPASS": str(askpass_path),
+            "SSH_ASKPASS_REQUIRE": "force",
+            ASKPASS_PASSWORD_ENV: password,
+        }
+    )
+    return env
+
+
+def _ensure_ssh_agent() -> None:
+    """Make sure an ssh-agent is reachable from this process.
+
+    When SSH_AUTH_SOCK doesn't point to a socket, a new agent is started and
+    its variables are exported to os.environ so ssh-add calls can reach it.
+    A 'eval "$(ssh-agent -s)"' in a subshell would lose them on exit.
+    """
+    auth_sock = os.environ.get("SSH_AUTH_SOCK")
+    if auth_sock and os.path.exists(auth_sock):
+        return
+
+    output = run_command(["ssh-agent", "-s"], check=False)
+    if not output:
+        print_warning("Could not start ssh-agent")
+        return
+
+    os.environ.update(_SSH_AGENT_ENV_RE.findall(output))
+
+
+def _load_fingerprint_cache() -> Dict[str, dict]:
+    """Load the SSH key fingerprints saved by previous runs.
+
+    Returns:
+        Mapping of key path to its file signature and fingerprint
+    """
+    try:
+        return json.loads(FINGERPRINT_CACHE_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_fingerprint_cache() -> None:
+    """Write the fingerprint cache back to disk if it changed.
+
+    Registered with atexit so the cache is written once per run.
+    """
+    if _fingerprint_cache_changed:
+        FINGERPRINT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps(_fingerprint_cache, indent=2) + "\n"
+        write_text_atomic(FINGERPRINT_CACHE_PATH, content)
+
+
+# Fingerprints are keyed by key path and only reused while the key file's
+# mtime and size are unchanged
+_fingerprint_cache: Dict[str, dict] = _load_fingerprint_cache()
+_fingerprint_cache_changed = False
+atexit.register(_save_fingerprint_cache)
+
+
+def _key_file_signature(key_path: Path) -> Optional[List[int]]:
+    """Get the modification time and size that identify a key file's content.
+
+    Args:
+        key_path: Path to the SSH key file
+
+    Returns:
+        [mtime_ns, size], or None if the file can't be read
+    """
+    try:
+        stat = key_path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _get_ssh_key_fingerprints(key_paths: List[Path]) -> Dict[Path, Optional[str]]:
+    """Get the fingerprints of several SSH keys, using the on-disk cache.
+
+    Only keys changed since a previous run are passed to ssh-keygen.
+
+    Args:
+        key_paths: Paths to the SSH private key files
+
+    Returns:
+        Mapping of key path to its fingerprint, None where it couldn't be read
+    """
+    global _fingerprint_cache_changed
+
+    fingerprints: Dict[Path, Optional[str]] = {}
+    signatures = {key_path: _key_file_signature(key_path) for key_path in key_paths}
+
+    for key_path, signature in signatures.items():
+        cached = _fingerprint_cache.get(str(key_path))
+        if signature and cached and cached.get("signature") == signature:
+            fingerprints[key_path] = cached["fingerprint"]
+
+    stale_keys = [key_path for key_path in key_paths if key_path not in fingerprints]
+    if stale_keys:
+        for key_path, fingerprint in _read_ssh_key_fingerprints(stale_keys).items():
+            fingerprints[key_path] = fingerprint
+            if fingerprint and signatures[key_path]:
+                _fingerprint_cache[str(key_path)] = {
+                    "signature": signatures[key_path],
+                    "fingerprint": fingerprint,
+                }
+                _fingerprint_cache_changed = True
+
+    return {key_path: fingerprints[key_path] for key_path in key_paths}
+
+
+def _read_ssh_key_fingerprints(key_paths: List[Path]) -> Dict[Path, Optional[str]]:
+    """Extract the fingerprints of several SSH keys.
+
+    The public keys are fed to a single 'ssh-keygen -lf -' call. Keys without
+    a readable .pub file, or a batch that doesn't line up, fall back to one
+    ssh-keygen call per key.
+
+    Args:
+        key_paths: Paths to the SSH private key files
+
+    Returns:
+        Mapping of key path to its fingerprint, None where it couldn't be read
+    """
+    public_keys = []
+    for key_path in key_paths:
+        try:
+            public_keys.append(Path(f"{key_path}.pub").read_text().strip())
+        except OSError:
+            break
+
+    if public_keys and len(public_keys) == len(key_paths):
+        output = run_command(
+            ["ssh-keygen", "-lf", "-"], check=False, input="\n".join(public_keys)
+        )
+        lines = output.splitlines() if output else []
+        if len(lines) == len(key_paths):
+            return {
+                key_path: line.split()[1] if len(line.split()) > 1 else None
+                for key_path, line in zip(key_paths, lines)
+            }
+
+    return {key_path: _get_ssh_key_fingerprint(key_path) for key_path in key_paths}
+
+
 def _get_ssh_key_fingerprint(key_path: Path) -> Optional[str]:
     """Extract the fingerprint from an SSH key file.
 
@@ -109,27 +281,50 @@ def _get_ssh_key_fingerprint(key_path: Path) -> Optional[str]:
     Returns:
         The fingerprint string if successful, None otherwise
     """
-    output = run_command(f"ssh-keygen -lf {key_path}", check=False)
+    output = run_command(["ssh-keygen", "-lf", str(key_path)], check=False)
     if output and len(output.split()) > 1:
         return output.split()[1]
     return None
 
 
-def _is_key_in_agent(key_path: Path) -> bool:
+def _list_agent_fingerprints() -> Set[str]:
+    """Get the fingerprints of the keys loaded in ssh-agent.
+
+    'ssh-add -l' runs once per setup run; later lookups use the cached set.
+
+    Returns:
+        Set of key fingerprints (empty if the agent has no keys)
+    """
+    global _agent_fingerprints
+
+    if _agent_fingerprints is None:
+        # Lines look like "256 SHA256:... comment (ED25519)"
+        agent_keys = run_command(["ssh-add", "-l"], check=False) or ""
+        _agent_fingerprints = {
+            fields[1]
+            for fields in map(str.split, agent_keys.splitlines())
+            if len(fields) > 1
+        }
+
+    return _agent_fingerprints
+
+
+def _is_key_in_agent(key_path: Path, fingerprint: Optional[str] = None) -> bool:
     """Check if an SSH key is already loaded in the SSH agent.
 
     Args:
         key_path: Path to the SSH key to check
+        fingerprint: The key's fingerprint, if already known
 
     Returns:
         True if the key is already in the agent, False otherwise
     """
-    agent_keys = run_command("ssh-add -l", check=False)
-    if not agent_keys:
+    agent_fingerprints = _list_agent_fingerprints()
+    if not agent_fingerprints:
         return False
 
-    key_fingerprint = _get_ssh_key_fingerprint(key_path)
-    return key_fingerprint and key_fingerprint in agent_keys
+    key_fingerprint = fingerprint or _get_ssh_key_fingerprint(key_path)
+    return key_fingerprint in agent_fingerprints
 
 
 def _key_has_passphrase(key_path: Path) -> bool:
@@ -141,8 +336,9 @@ def _key_has_passphrase(key_path: Path) -> bool:
     Returns:
         True if the key has a passphrase, False otherwise
     """
+    # An empty -P makes ssh-keygen fail on protected keys instead of prompting
     result = subprocess.run(
-        ["ssh-keygen", "-y", "-f", str(key_path)], capture_output=True, text=True
+        ["ssh-keygen", "-y", "-P", "", "-f", str(key_path)], capture_output=True
     )
     return result.returncode != 0
 
@@ -174,35 +370,79 @@ Host *
             if existing_config and not existing_config.endswith("\n"):
                 existing_config += "\n"
 
-            config_file.write_text(existing_config + "\n" + ssh_config)
+            _write_secure(config_file, existing_config + "\n" + ssh_config)
             print_info("Added SSH config to existing file")
         else:
+            config_file.chmod(0o600)  # Ensure secure permissions
             print_info("SSH config already configured by mac-setup")
     else:
-        config_file.write_text(ssh_config)
+        _write_secure(config_file, ssh_config)
         print_info("Created new SSH config")
 
-    # Ensure secure permissions
-    config_file.chmod(0o600)
 
+def _write_secure(file_path: Path, content: str, mode: int = 0o600) -> None:
+    """Write a file with the given permissions from the moment it is opened.
 
-def _add_existing_key_to_agent(key_path: Path) -> None:
-    """Add an existing SSH key to ssh-agent, prompting for password if needed.
+    The file is created with mode directly, and an existing file gets mode
+    before anything is written to it.
 
     Args:
-        key_path: Path to the SSH key to add
+        file_path: Path of the file to write
+        content: Text to write
+        mode: Permission bits for the file
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    os.fchmod(fd, mode)
+    with os.fdopen(fd, "w") as file:
+        file.write(content)
+
+
+def _add_keys_to_agent(key_paths: List[Path]) -> None:
+    """Add several existing SSH keys to ssh-agent.
+
+    The fingerprints of all keys are read in one batch and compared with a
+    single listing of the agent's keys. The passphrase checks of the keys
+    still missing run concurrently; adding them stays sequential since it
+    may prompt for a passphrase.
+
+    Args:
+        key_paths: Paths to the SSH keys to add
     """
     # Start ssh-agent if needed
-    run_command('eval "$(ssh-agent -s)"', check=False)
+    _ensure_ssh_agent()
+
+    fingerprints = _get_ssh_key_fingerprints(key_paths)
+    missing_keys = []
+    for key_path in key_paths:
+        if _is_key_in_agent(key_path, fingerprints[key_path]):
+            print_success(f"{key_path.name} is already in ssh-agent")
+        else:
+            missing_keys.append(key_path)
 
-    # Check if key is already in agent
-    if _is_key_in_agent(key_path):
-        print_success(f"{key_path.name} is already in ssh-agent")
+    if not missing_keys:
         return
 
+    workers = min(SSH_KEY_CHECK_WORKERS, len(missing_keys))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        passphrase_flags = list(executor.map(_key_has_passphrase, missing_keys))
+
+    for key_path, has_passphrase in zip(missing_keys, passphrase_flags):
+        _add_missing_key_to_agent(key_path, fingerprints[key_path], has_passphrase)
+
+
+def _add_missing_key_to_agent(
+    key_path: Path, fingerprint: Optional[str], has_passphrase: bool
+) -> None:
+    """Add an SSH key that isn't in ssh-agent yet, prompting for password if needed.
+
+    Args:
+        key_path: Path to the SSH key to add
+        fingerprint: The key's fingerprint, if known
+        has_passphrase: Whether the key is protected by a passphrase
+    """
     print_info(f"Adding {key_path.name} to ssh-agent...")
 
-    if _key_has_passphrase(key_path):
+    if has_passphrase:
         # Key has passphrase, prompt for it
         print(
             f"{Colors.YELLOW}This SSH key is protected by a passphrase.{Colors.RESET}"
@@ -211,7 +451,8 @@ def _add_existing_key_to_agent(key_path: Path) -> None:
             f"{Colors.BLUE}Enter passphrase for {key_path.name}: {Colors.RESET}"
         )
 
-        if _add_key_to_agent_with_password(key_path, password):
+        added = _add_key_to_agent_with_password(key_path, password)
+        if added:
             print_success(f"{key_path.name} added to ssh-agent with keychain")
         else:
             print_warning(
@@ -223,13 +464,17 @@ def _add_existing_key_to_agent(key_path: Path) -> None:
         result = subprocess.run(
             ["ssh-add", "--apple-use-keychain", str(key_path)],
             capture_output=True,
-            text=True,
         )
-        if result.returncode == 0:
+        added = result.returncode == 0
+        if added:
             print_success(f"{key_path.name} added to ssh-agent")
         else:
             print_warning(f"Could not add {key_path.name} to ssh-agent")
 
+    # Keep the cached agent listing current for later checks
+    if added and fingerprint:
+        _list_agent_fingerprints().add(fingerprint)
+
 
 def _find_ssh_backups() -> List[Path]:
     """Find SSH backup files in iCloud backup directory.
@@ -237,7 +482,7 @@ def _find_ssh_backups() -> List[Path]:
     Returns:
         List of backup file paths, sorted by most recent first
     """
-    backup_dir = Path(os.environ["HOME"]) / BACKUP_DIR_PATH
+    backup_dir = HOME / BACKUP_DIR_PATH
     if not backup_dir.exists():
         return []
 
@@ -253,25 +498,34 @@ def _restore_ssh_from_backup(backup_path: Path, ssh_dir: Path) -> None:
     """
     print_info("Restoring SSH keys from backup...")
 
-    # Extract backup to home directory
-    with zipfile.ZipFile(backup_path, "r") as zip_ref:
-        zip_ref.extractall(os.environ["HOME"])
-
-    # Fix directory and file permissions
+    # Extract the backup's .ssh entries into the home directory, fixing the
+    # permissions of each key as soon as it is written
+    ssh_dir.mkdir(mode=0o700, exist_ok=True)
     ssh_dir.chmod(0o700)
-    for file_path in ssh_dir.iterdir():
-        if file_path.name.startswith("id_"):
-            if file_path.name.endswith(".pub"):
-                file_path.chmod(0o644)  # Public keys are readable
-            else:
-                file_path.chmod(0o600)  # Private keys are restricted
+    member_prefix = f"{ssh_dir.name}/"
+
+    private_keys = []
+    with zipfile.ZipFile(backup_path, "r") as zip_ref:
+        for member in zip_ref.infolist():
+            if not member.filename.startswith(member_prefix):
+                print_warning(f"Skipping {member.filename} outside {member_prefix}")
+                continue
+
+            target = Path(zip_ref.extract(member, HOME))
+            if member.is_dir() or target.parent != ssh_dir:
+                continue
+
+            if target.name.startswith("id_"):
+                if target.name.endswith(".pub"):
+                    os.chmod(target, 0o644)  # Public keys are readable
+                else:
+                    os.chmod(target, 0o600)  # Private keys are restricted
+                    private_keys.append(target)
 
     print_success("SSH keys restored from backup")
 
     # Add all restored keys to ssh-agent
-    for key_file in ssh_dir.glob("id_*"):
-        if not key_file.name.endswith(".pub"):
-            _add_existing_key_to_agent(key_file)
+    _add_keys_to_agent(private_keys)
 
 
 def _generate_secure_password() -> str:
@@ -281,7 +535,18 @@ def _generate_secure_password() -> str:
         A secure random password string
     """
     alphabet = string.ascii_letters + string.digits + string.punctuation
-    return "".join(secrets.choice(alphabet) for _ in range(PASSWORD_LENGTH))
+
+    # Map random bytes onto the alphabet, dropping the bytes above the last
+    # full multiple of its length so every character stays equally likely
+    limit = 256 // len(alphabet) * len(alphabet)
+    password = ""
+    while len(password) < PASSWORD_LENGTH:
+        random_bytes = secrets.token_bytes(PASSWORD_LENGTH * 2)
+        password += "".join(
+            alphabet[byte % len(alphabet)] for byte in random_bytes if byte < limit
+        )
+
+    return password[:PASSWORD_LENGTH]
 
 
 def _display_password_warning(password: str) -> None:
@@ -314,19 +579,19 @@ def _generate_ssh_key(email: str, key_path: Path, password: str) -> None:
     """
     print_info(f"Generating {SSH_KEY_TYPE.upper()} SSH key...")
 
-    # Generate key without passphrase initially
-    subprocess.run(
-        ["ssh-keygen", "-t", SSH_KEY_TYPE, "-C", email, "-f", str(key_path), "-N", ""],
-        check=True,
-    )
+    # ssh-keygen asks for the new passphrase (twice) through the askpass
+    # script, so the passphrase never shows up in its argv
+    askpass_path = _create_askpass_script()
 
-    # Add passphrase to the key
-    print_info("Adding passphrase to SSH key...")
-    subprocess.run(
-        ["ssh-keygen", "-p", "-f", str(key_path), "-N", password, "-P", ""],
-        check=True,
-        capture_output=True,
-    )
+    try:
+        subprocess.run(
+            ["ssh-keygen", "-t", SSH_KEY_TYPE, "-C", email, "-f", str(key_path)],
+            env=_askpass_env(askpass_path, password),
+            stdin=subprocess.DEVNULL,
+            check=True,
+        )
+    finally:
+        askpass_path.unlink(missing_ok=True)
 
 
 def _display_public_key(key_path: Path) -> None:
@@ -335,8 +600,7 @@ def _display_public_key(key_path: Path) -> None:
     Args:
         key_path: Path to the private key (public key path will be derived)
     """
-    public_key_path = f"{key_path}.pub"
-    public_key = run_command(f"cat {public_key_path}")
+    public_key = Path(f"{key_path}.pub").read_text().strip()
 
     separator = "=" * 60
     print("\n" + separator)
@@ -347,7 +611,7 @@ def _display_public_key(key_path: Path) -> None:
 
     # Copy to clipboard if pbcopy is available
     if command_exists("pbcopy"):
-        run_command(f"cat {public_key_path} | pbcopy")
+        run_command(["pbcopy"], input=public_key)
         print(f"\n{Colors.GREEN}✓ Public key copied to clipboard!{Colors.RESET}")
 
 
@@ -368,6 +632,22 @@ def _display_github_instructions() -> None:
     print(separator + "\n")
 
 
+def _run_with_timeout(command: List[str]) -> Optional[subprocess.CompletedProcess]:
+    """Run a network command, giving up after GITHUB_SSH_TIMEOUT seconds.
+
+    Args:
+        command: Command and arguments to run
+
+    Returns:
+        The completed process with bytes output, or None if it timed out
+    """
+    try:
+        return subprocess.run(command, capture_output=True, timeout=GITHUB_SSH_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        print_warning(f"{command[0]} timed out after {GITHUB_SSH_TIMEOUT}s")
+        return None
+
+
 def _test_github_connection(ssh_dir: Path) -> None:
     """Test SSH connection to GitHub and add to known hosts if needed.
 
@@ -378,25 +658,44 @@ def _test_github_connection(ssh_dir: Path) -> None:
 
     # Add GitHub to known hosts if not already there
     known_hosts_file = ssh_dir / "known_hosts"
-    if (
-        not known_hosts_file.exists()
-        or "github.com" not in known_hosts_file.read_text()
-    ):
+    if not _file_contains(known_hosts_file, b"github.com"):
         print_info("Adding GitHub to known hosts...")
-        run_command(
-            f"ssh-keyscan -t {SSH_KEY_TYPE} github.com >> ~/.ssh/known_hosts",
-            check=False,
-        )
-
-    # Test the connection
-    test_result = run_command("ssh -T git@github.com 2>&1", check=False)
-    if test_result and "successfully authenticated" in test_result:
+        host_keys = _run_with_timeout(["ssh-keyscan", "-t", SSH_KEY_TYPE, "github.com"])
+        if host_keys and host_keys.stdout:
+            with known_hosts_file.open("ab") as known_hosts:
+                known_hosts.write(host_keys.stdout)
+
+    # Test the connection; GitHub reports success on stderr with exit code 1
+    test_result = _run_with_timeout(["ssh", "-T", "git@github.com"])
+    if test_result and b"successfully authenticated" in (
+        test_result.stdout + test_result.stderr
+    ):
         print_success("GitHub SSH authentication successful!")
     else:
         print_warning("Could not verify GitHub connection.")
         print_info("Try running manually: ssh -T git@github.com")
 
 
+def _file_contains(file_path: Path, needle: bytes) -> bool:
+    """Check whether a file contains a byte string without reading it into memory.
+
+    Args:
+        file_path: Path to the file to search
+        needle: Bytes to look for
+
+    Returns:
+        True if the file exists and contains the bytes, False otherwise
+    """
+    try:
+        with file_path.open("rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return False  # mmap can't map an empty file
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped.find(needle) != -1
+    except FileNotFoundError:
+        return False
+
+
 def setup_ssh_key() -> None:
     """Generate a new SSH key with secure password and configure ssh-agent.
 
@@ -410,14 +709,14 @@ def setup_ssh_key() -> None:
     print_info("Setting up SSH key...")
 
     # Ensure SSH directory exists with proper permissions
-    ssh_dir = Path(os.environ["HOME"]) / ".ssh"
+    ssh_dir = SSH_DIR
     ssh_dir.mkdir(mode=0o700, exist_ok=True)
 
     # Check if default key already exists
     key_path = ssh_dir / SSH_KEY_FILENAME
     if key_path.exists():
         print_success(f"SSH key already exists at ~/.ssh/{SSH_KEY_FILENAME}")
-        _add_existing_key_to_agent(key_path)
+        _add_keys_to_agent([key_path])
         return
 
     # Check for SSH backups in iCloud
@@ -426,9 +725,10 @@ def setup_ssh_key() -> None:
         print_info(f"Found {len(backups)} SSH backup(s) in iCloud")
         print(f"\n{Colors.BLUE}Most recent backup:{Colors.RESET} {backups[0].name}")
 
-        response = input(
-            f"{Colors.YELLOW}Would you like to restore from backup? (yes/no): {Colors.RESET}"
-        ).lower()
+        response = prompt_for_user_input(
+            "Would you like to restore from backup? (yes/no)",
+            valid_responses=["yes", "no"],
+        )
 
         if response == "yes":
             _restore_ssh_from_backup(backups[0], ssh_dir)
@@ -442,9 +742,9 @@ def setup_ssh_key() -> None:
     )
 
     # Get user email
-    email = input(
-        f"{Colors.BLUE}Enter your email address for the SSH key "
-        f"(used for Git commits): {Colors.RESET}"
+    email = prompt_for_user_input(
+        "Enter your email address for the SSH key (used for Git commits)",
+        case_sensitive=True,
     )
 
     # Generate the SSH key
@@ -455,7 +755,7 @@ def setup_ssh_key() -> None:
 
     # Add key to ssh-agent
     print_info("Adding SSH key to ssh-agent...")
-    run_command('eval "$(ssh-agent -s)"')
+    _ensure_ssh_agent()
 
     if _add_key_to_agent_with_password(key_path, password):
         print_success("SSH key added to ssh-agent with keychain")
@@ -476,7 +776,7 @@ def setup_ssh_key() -> None:
     print_success("SSH key setup completed")
 
 
-def _create_backup_script(backup_dir: str) -> str:
+def _create_backup_script(backup_dir: Path) -> str:
     """Create the SSH backup shell script content.
 
     Args:
@@ -515,16 +815,14 @@ def setup_ssh_backup_cron() -> None:
     print_info("Setting up SSH backup cron job...")
 
     # Prepare paths
-    home = os.environ["HOME"]
-    backup_dir = f"{home}/{BACKUP_DIR_PATH}"
-    scripts_dir = Path(home) / ".local" / "bin"
+    backup_dir = HOME / BACKUP_DIR_PATH
+    scripts_dir = HOME / ".local" / "bin"
     scripts_dir.mkdir(parents=True, exist_ok=True)
 
     # Create backup script
     script_path = scripts_dir / "ssh_backup.sh"
     backup_script = _create_backup_script(backup_dir)
-    script_path.write_text(backup_script)
-    script_path.chmod(0o755)
+    _write_secure(script_path, backup_script, mode=0o755)
 
     # Setup cron job to run weekly on Sunday at 2 AM
     setup_cron_job(
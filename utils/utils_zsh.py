@@ -6,13 +6,17 @@ and enhancements including Oh My Zsh, shell plugins, and productivity tools.
 """
 
 import os
+import re
 from pathlib import Path
 from typing import List, Optional
 
 from .utils_core import (
+    HOME,
+    ZSHRC,
     Colors,
     append_shell_section,
     command_exists,
+    commit_shell_sections,
     is_step_completed,
     mark_step_completed,
     print_error,
@@ -21,14 +25,20 @@ from .utils_core import (
     print_warning,
     prompt_for_user_input,
     run_command,
+    run_installer_script,
+    shell_config_lock,
+    write_text_atomic,
 )
-from .utils_install import install_brew_package
+from .utils_install import install_brew_package, install_brew_packages
 
 # Constants
-OH_MY_ZSH_INSTALL_URL = "https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh"
 FAST_SYNTAX_HIGHLIGHTING_REPO = "https://github.com/zdharma-continuum/fast-syntax-highlighting.git"
-ATUIN_INSTALL_URL = "https://setup.atuin.sh"
 MANUAL_CONFIG_SEPARATOR = "=" * 60
+OMZ_DIR = HOME / ".oh-my-zsh"
+
+# The plugins declaration, from "plugins=" through the rest of the line holding
+# the closing parenthesis, whether it spans one line or several
+PLUGINS_DECLARATION_RE = re.compile(r"^[ \t]*plugins=[^)]*\).*$", re.MULTILINE)
 
 
 def setup_oh_my_zsh() -> None:
@@ -37,15 +47,12 @@ def setup_oh_my_zsh() -> None:
     Oh My Zsh is a framework for managing ZSH configuration with themes
     and plugins support.
     """
-    oh_my_zsh_dir = Path(os.environ["HOME"]) / ".oh-my-zsh"
-
-    if oh_my_zsh_dir.exists():
+    if OMZ_DIR.exists():
         print_success("Oh My Zsh is already installed")
         return
 
     print_info("Installing Oh My Zsh...")
-    install_command = f'sh -c "$(curl -fsSL {OH_MY_ZSH_INSTALL_URL})"'
-    run_command(install_command)
+    run_installer_script("oh-my-zsh")
     print_success("Oh My Zsh installed successfully")
 
 
@@ -73,12 +80,9 @@ def setup_fzf() -> None:
     """
     print_info("Setting up fzf...")
 
-    # Install dependencies for better fzf experience
-    install_brew_package("fd", "formula")  # Fast file finder
-    install_brew_package("bat", "formula")  # Syntax highlighting for file preview
-
-    # Install fzf itself
-    install_brew_package("fzf", "formula")
+    # Install fzf along with fd (fast file finder) and bat (syntax
+    # highlighting for file preview) for a better fzf experience
+    install_brew_packages(["fd", "bat", "fzf"])
 
     # Add shell integration to enable keybindings
     append_shell_section("fzf shell integration", ["source <(fzf --zsh)"])
@@ -116,7 +120,7 @@ def setup_fast_syntax_highlighting() -> None:
     print_info("Setting up fast-syntax-highlighting...")
 
     # Determine the custom plugins directory
-    zsh_custom = os.environ.get("ZSH_CUSTOM", f"{os.environ['HOME']}/.oh-my-zsh/custom")
+    zsh_custom = os.environ.get("ZSH_CUSTOM", str(OMZ_DIR / "custom"))
     plugin_dir = Path(zsh_custom) / "plugins" / "fast-syntax-highlighting"
 
     # Check if plugin is already installed
@@ -125,11 +129,7 @@ def setup_fast_syntax_highlighting() -> None:
         return
 
     # Clone the plugin repository
-    clone_command = (
-        f"git clone {FAST_SYNTAX_HIGHLIGHTING_REPO} "
-        f"${{ZSH_CUSTOM:-$HOME/.oh-my-zsh/custom}}/plugins/fast-syntax-highlighting"
-    )
-    run_command(clone_command)
+    run_command(["git", "clone", FAST_SYNTAX_HIGHLIGHTING_REPO, str(plugin_dir)])
     print_success("fast-syntax-highlighting installed successfully")
 
 
@@ -158,12 +158,11 @@ def setup_atuin() -> None:
     else:
         # Install Atuin using their official installer
         print_info("Installing Atuin...")
-        install_command = f"curl --proto '=https' --tlsv1.2 -LsSf {ATUIN_INSTALL_URL} | sh"
-        run_command(install_command)
+        run_installer_script("atuin")
 
         # Import existing shell history into Atuin
         print_info("Importing shell history...")
-        run_command("atuin import auto")
+        run_command(["atuin", "import", "auto"])
 
     # Configure shell integration
     atuin_config = [
@@ -189,6 +188,9 @@ def _handle_atuin_sync_setup() -> None:
     if is_step_completed(flag_name):
         return
 
+    # The steps below run in a new terminal, which needs the Atuin section
+    commit_shell_sections()
+
     _print_manual_config_header("MANUAL CONFIGURATION REQUIRED")
 
     print(f"\n{Colors.BLUE}To enable Atuin sync across devices:{Colors.RESET}")
@@ -202,10 +204,11 @@ def _handle_atuin_sync_setup() -> None:
     response = prompt_for_user_input(
         "Type 'done' when you have completed this step (or 'skip' to continue without sync)",
         valid_responses=["done", "skip"],
+        default="skip",
     )
 
     if response == "done":
-        run_command("atuin sync")
+        run_command(["atuin", "sync"])
         mark_step_completed(flag_name)
         print_success("Atuin login configuration completed")
     else:
@@ -261,76 +264,30 @@ def align_zsh_plugins(desired_plugins: List[str], zshrc_path: Optional[str] = No
         This function modifies the .zshrc file in place. Make sure to have
         a backup before running.
     """
-    config_path = Path(zshrc_path or f"{os.environ['HOME']}/.zshrc")
-
-    if not config_path.exists():
-        print_error(f".zshrc file not found at {config_path}")
-        return
-
-    # Read current configuration
-    lines = config_path.read_text().splitlines()
-
-    # Find the plugins declaration
-    plugin_indices = _find_plugin_declaration(lines)
-
-    if plugin_indices is None:
-        print_error("No complete plugins declaration found in .zshrc")
-        return
-
-    start_index, end_index = plugin_indices
-
-    # Replace the old plugin declaration with new one
-    _replace_plugin_declaration(lines, start_index, end_index, desired_plugins)
-
-    # Write the updated configuration
-    config_path.write_text("\n".join(lines) + "\n")
-    print_success(f"Updated plugins in {config_path}: ({' '.join(desired_plugins)})")
-
-
-def _find_plugin_declaration(lines: List[str]) -> Optional[tuple[int, int]]:
-    """Find the start and end indices of the plugins declaration.
-
-    Args:
-        lines: List of lines from .zshrc
-
-    Returns:
-        Tuple of (start_index, end_index) or None if not found
-    """
-    for i, line in enumerate(lines):
-        if line.strip().startswith("plugins="):
-            start_index = i
-
-            # Check if it's a single-line declaration
-            if ")" in line:
-                return (start_index, i)
-
-            # Multi-line declaration: find the closing parenthesis
-            for j in range(i + 1, len(lines)):
-                if ")" in lines[j]:
-                    return (start_index, j)
-
-            # No closing parenthesis found
-            break
-
-    return None
-
-
-def _replace_plugin_declaration(lines: List[str], start_index: int, end_index: int, desired_plugins: List[str]) -> None:
-    """Replace the plugin declaration in the lines list.
-
-    Args:
-        lines: List of lines to modify (modified in place)
-        start_index: Index of the first line of plugin declaration
-        end_index: Index of the last line of plugin declaration
-        desired_plugins: List of plugins to set
-    """
-    # Remove old declaration lines
-    for _ in range(end_index - start_index + 1):
-        lines.pop(start_index)
-
-    # Insert new single-line plugins declaration
-    plugins_line = f"plugins=({' '.join(desired_plugins)})"
-    lines.insert(start_index, plugins_line)
+    config_path = Path(zshrc_path) if zshrc_path else ZSHRC
+
+    with shell_config_lock:
+        if not config_path.exists():
+            print_error(f".zshrc file not found at {config_path}")
+            return
+
+        # Replace the first plugins declaration with a single-line one
+        content = config_path.read_text()
+        plugins_list = f"({' '.join(desired_plugins)})"
+        plugins_line = f"plugins={plugins_list}"
+        new_content, replaced = PLUGINS_DECLARATION_RE.subn(
+            lambda _: plugins_line, content, count=1
+        )
+
+        if not replaced:
+            print_error("No complete plugins declaration found in .zshrc")
+            return
+
+        # Skip the write when the plugins are already aligned
+        if new_content != content:
+            write_text_atomic(config_path, new_content)
+
+    print_success(f"Updated plugins in {config_path}: {plugins_list}")
 
 
 def setup_iterm2_natural_text_editing() -> None: